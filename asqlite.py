@@ -24,58 +24,285 @@ import sqlite3
 import threading
 import queue
 import asyncio
+import collections
+import contextlib
+import contextvars
+import functools
+import itertools
+import re
+import time
 
 PARSE_DECLTYPES = sqlite3.PARSE_DECLTYPES
 PARSE_COLNAMES = sqlite3.PARSE_COLNAMES
 
 
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+_PRIORITY_NAMES = {PRIORITY_HIGH: 'high', PRIORITY_NORMAL: 'normal', PRIORITY_LOW: 'low'}
+_priority = contextvars.ContextVar('asqlite_priority', default=PRIORITY_NORMAL)
+
+
 class _WorkerEntry:
-    __slots__ = ('func', 'args', 'kwargs', 'future', 'cancelled')
+    __slots__ = ('func', 'args', 'kwargs', 'future', 'cancelled', 'lane', 'posted_at', 'sql')
 
-    def __init__(self, func, args, kwargs, future):
+    def __init__(self, func, args, kwargs, future, lane, sql=None):
         self.func = func
         self.args = args
         self.kwargs = kwargs
         self.future = future
+        self.lane = lane
+        self.posted_at = time.perf_counter()
+        self.sql = sql
+
+
+class _LaneStats:
+    __slots__ = ('posted', 'completed', 'throttled', 'rejected', 'wait_total', 'wait_max')
+
+    def __init__(self):
+        # posted, throttled and rejected are only written on the loop, the rest only on the worker thread
+        self.posted = 0
+        self.completed = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def to_dict(self):
+        return {
+            'posted': self.posted,
+            'completed': self.completed,
+            'throttled': self.throttled,
+            'rejected': self.rejected,
+            'wait_avg': self.wait_total / self.completed if self.completed else 0.0,
+            'wait_max': self.wait_max,
+        }
+
+
+_LITERAL_REGEX = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """Normalizes a statement so queries that only differ in literals and whitespace are grouped together."""
+    return ' '.join(_LITERAL_REGEX.sub('?', sql).split())
+
+
+class QueryStats:
+    """Per-statement timings, recorded on the worker threads once enabled with :meth:`Connection.instrument`.
+
+    Statements are grouped by :func:`fingerprint`. Call counts and total times cover
+    every call, the percentiles are computed over the last ``samples`` calls.
+    """
+
+    def __init__(self, samples=1024):
+        self.samples = samples
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, sql, elapsed):
+        key = fingerprint(sql)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = [0, 0.0, collections.deque(maxlen=self.samples)]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2].append(elapsed)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self):
+        """Returns a ``{fingerprint: {'calls', 'total', 'p50', 'p99'}}`` dict, times are in seconds."""
+        with self._lock:
+            stats = [(key, calls, total, sorted(samples)) for key, (calls, total, samples) in self._stats.items()]
+
+        return {
+            key: {
+                'calls': calls,
+                'total': total,
+                'p50': samples[int((len(samples) - 1) * 0.50)],
+                'p99': samples[int((len(samples) - 1) * 0.99)],
+            }
+            for key, calls, total, samples in stats
+        }
 
 
 class _Worker(threading.Thread):
-    def __init__(self, *, loop):
-        super().__init__(name='asqlite-worker-thread', daemon=True)
+    # Results of entries that ran back to back are handed to the loop in one callback, up to this many
+    max_batch = 64
+
+    def __init__(self, *, loop, name='asqlite-worker-thread', max_queue=None, backpressure='wait'):
+        super().__init__(name=name, daemon=True)
         self.loop = loop
-        self._worker_queue = queue.Queue()
-        self._end = threading.Event()
+        self.max_queue = max_queue
+        self.backpressure = backpressure
+        self.depth = 0
+        self.query_stats = None
+        self.lanes = {priority: _LaneStats() for priority in _PRIORITY_NAMES}
+        # One deque per priority, every entry appended to them puts one wakeup token in the queue.
+        # A token without an entry left to run is the stop signal.
+        self._entries = [collections.deque() for _ in _PRIORITY_NAMES]
+        self._worker_queue = queue.SimpleQueue()
+        self._waiters = collections.deque()
 
     def _call_entry(self, entry):
-        fut = entry.future
-        if fut.cancelled():
-            return
+        lane = entry.lane
+        wait = time.perf_counter() - entry.posted_at
+        lane.completed += 1
+        lane.wait_total += wait
+        if wait > lane.wait_max:
+            lane.wait_max = wait
+
+        if entry.future.cancelled():
+            return entry.future, None, None
+
+        query_stats = self.query_stats
+        if query_stats is None or entry.sql is None:
+            try:
+                return entry.future, None, entry.func(*entry.args, **entry.kwargs)
+            except Exception as e:
+                return entry.future, e, None
 
+        start = time.perf_counter()
         try:
-            result = entry.func(*entry.args, **entry.kwargs)
+            return entry.future, None, entry.func(*entry.args, **entry.kwargs)
         except Exception as e:
-            self.loop.call_soon_threadsafe(fut.set_exception, e)
-        else:
-            self.loop.call_soon_threadsafe(fut.set_result, result)
+            return entry.future, e, None
+        finally:
+            query_stats.record(entry.sql, time.perf_counter() - start)
+
+    def _set_results(self, completed):
+        self.depth -= len(completed)
+        if self._waiters:
+            self._wake_waiters()
+
+        for future, exception, result in completed:
+            if future.cancelled():
+                continue
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
+    def _complete(self, completed):
+        try:
+            self.loop.call_soon_threadsafe(self._set_results, completed)
+        except RuntimeError:
+            # The loop was closed before the connection was
+            pass
+
+    def _next_entry(self):
+        for entries in self._entries:
+            if entries:
+                return entries.popleft()
+        return None
 
     def run(self):
-        _queue = self._worker_queue
-        while not self._end.is_set():
+        get, get_nowait = self._worker_queue.get, self._worker_queue.get_nowait
+        completed = []
+
+        get()
+        while True:
+            entry = self._next_entry()
+            if entry is None:
+                break
+
+            completed.append(self._call_entry(entry))
+
             try:
-                entry = _queue.get(timeout=0.2)
+                get_nowait()
             except queue.Empty:
-                continue
+                more = False
             else:
-                self._call_entry(entry)
+                more = True
 
-    def post(self, func, *args, **kwargs):
+            if not more or len(completed) >= self.max_batch:
+                self._complete(completed)
+                completed = []
+
+            if not more:
+                get()
+
+        if completed:
+            self._complete(completed)
+
+    def _enqueue(self, func, args, kwargs, priority, sql):
         future = self.loop.create_future()
-        entry = _WorkerEntry(func=func, args=args, kwargs=kwargs, future=future)
-        self._worker_queue.put_nowait(entry)
+        lane = self.lanes[priority]
+        lane.posted += 1
+        self._entries[priority].append(_WorkerEntry(func=func, args=args, kwargs=kwargs, future=future, lane=lane,
+                                                    sql=sql))
+        self._worker_queue.put(None)
         return future
 
+    def post(self, func, *args, priority=None, sql=None, **kwargs):
+        """Queues ``func`` to run on the thread, ignoring the queue bound.
+
+        ``priority`` defaults to the one set with :meth:`Connection.priority`.
+        Entries run in priority order, and in posting order within a priority.
+        ``sql`` is the statement the call runs, which is timed when :attr:`query_stats` is set.
+        """
+        self.depth += 1
+        return self._enqueue(func, args, kwargs, _priority.get() if priority is None else priority, sql)
+
+    def _must_wait(self, priority):
+        if self.max_queue is None or priority == PRIORITY_HIGH:
+            return False
+        return bool(self._waiters) or self.depth >= self.max_queue
+
+    def _wake_waiters(self):
+        while self._waiters and self.depth < self.max_queue:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot is taken here so woken waiters can't be overtaken
+                self.depth += 1
+                waiter.set_result(None)
+
+    async def submit(self, func, *args, priority=None, sql=None, **kwargs):
+        """Like :meth:`post`, but applies backpressure once ``max_queue`` entries are pending.
+
+        Depending on ``backpressure`` this either waits for a free slot (``'wait'``) or raises
+        :exc:`asyncio.QueueFull` (``'raise'``). :data:`PRIORITY_HIGH` entries are never held back.
+        """
+        priority = _priority.get() if priority is None else priority
+
+        if not self._must_wait(priority):
+            return await self.post(func, *args, priority=priority, sql=sql, **kwargs)
+
+        if self.backpressure == 'raise':
+            self.lanes[priority].rejected += 1
+            raise asyncio.QueueFull(f'{self.name} has {self.depth} pending entries')
+
+        self.lanes[priority].throttled += 1
+        waiter = self.loop.create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed to us, give it to the next waiter
+                self.depth -= 1
+                self._wake_waiters()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+        return await self._enqueue(func, args, kwargs, priority, sql)
+
+    def stats(self):
+        return {
+            'depth': self.depth,
+            'waiting': len(self._waiters),
+            'lanes': {name: self.lanes[priority].to_dict() for priority, name in _PRIORITY_NAMES.items()},
+        }
+
     def stop(self):
-        self._end.set()
+        """Stops the thread once every entry posted before this call has run."""
+        self._worker_queue.put(None)
 
 
 class _ContextManagerMixin:
@@ -89,7 +316,7 @@ class _ContextManagerMixin:
         self.__result = None
 
     async def _runner(self):
-        future = self._worker.post(self.func, *self.args, **self.kwargs)
+        future = self._worker.submit(self.func, *self.args, **self.kwargs)
         if self.timeout is not None:
             ret = await asyncio.wait_for(future, timeout=self.timeout)
         else:
@@ -111,16 +338,28 @@ class _ContextManagerMixin:
         if self.__result is not None:
             await self.__result.close()
 
+    async def __aiter__(self):
+        cursor = await self._runner()
+        try:
+            async for row in cursor:
+                yield row
+        finally:
+            await cursor.close()
+
 
 class Cursor:
     """An asyncio-compatible version of :class:`sqlite3.Cursor`.
     Create these with :meth:`Connection.cursor`.
+    Iterating over a cursor with ``async for`` fetches the rows
+    :attr:`chunk_size` at a time on the worker thread.
     """
 
-    def __init__(self, connection, cursor):
+    def __init__(self, connection, cursor, *, post=None, sql=None):
         self._conn = connection
         self._cursor = cursor
-        self._post = connection._post
+        self._post = post or connection._post
+        self._sql = sql
+        self.chunk_size = connection.chunk_size
 
     async def __aenter__(self):
         return self
@@ -128,6 +367,15 @@ class Cursor:
     async def __aexit__(self, exc_type, exc, tb):
         await self.close()
 
+    async def __aiter__(self):
+        while True:
+            rows = await self._post(self._cursor.fetchmany, self.chunk_size, sql=self._sql)
+            if not rows:
+                return
+
+            for row in rows:
+                yield row
+
     def get_cursor(self):
         """Retrieves the internal :class:`sqlite3.Cursor` object."""
         return self._cursor
@@ -145,11 +393,13 @@ class Cursor:
         """Asynchronous version of :meth:`sqlite3.Cursor.execute`."""
         if len(parameters) == 1 and isinstance(parameters[0], (dict, tuple)):
             parameters = parameters[0]
-        return await self._post(self._cursor.execute, sql, parameters)
+        self._sql = sql
+        return await self._post(self._cursor.execute, sql, parameters, sql=sql)
 
     async def executemany(self, sql, seq_of_parameters):
         """Asynchronous version of :meth:`sqlite3.Cursor.executemany`."""
-        return await self._post(self._cursor.executemany, sql, seq_of_parameters)
+        self._sql = sql
+        return await self._post(self._cursor.executemany, sql, seq_of_parameters, sql=sql)
 
     async def executescript(self, sql_script):
         """Asynchronous version of :meth:`sqlite3.Cursor.executescript`."""
@@ -157,16 +407,16 @@ class Cursor:
 
     async def fetchone(self):
         """Asynchronous version of :meth:`sqlite3.Cursor.fetchone`."""
-        return await self._post(self._cursor.fetchone)
+        return await self._post(self._cursor.fetchone, sql=self._sql)
 
     async def fetchmany(self, size=None):
         """Asynchronous version of :meth:`sqlite3.Cursor.fetchmany`."""
         size = self._cursor.arraysize if size is None else size
-        return await self._post(self._cursor.fetchmany, size)
+        return await self._post(self._cursor.fetchmany, size, sql=self._sql)
 
     async def fetchall(self):
         """Asynchronous version of :meth:`sqlite3.Cursor.fetchall`."""
-        return await self._post(self._cursor.fetchall)
+        return await self._post(self._cursor.fetchall, sql=self._sql)
 
 
 class Transaction:
@@ -226,6 +476,22 @@ class _CursorWithTransaction(Cursor):
             await self.close()
 
 
+_READ_ONLY_REGEX = re.compile(r'\s*(SELECT|VALUES)\b', re.IGNORECASE)
+
+
+def _fetch(connection, method, query, parameters, size):
+    # Runs on a reader thread, executing and fetching in one round trip
+    cursor = connection.execute(query, parameters)
+    try:
+        if method == 'one':
+            return cursor.fetchone()
+        if method == 'many':
+            return cursor.fetchmany(cursor.arraysize if size is None else size)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
 class Connection:
     """An asyncio-compatible version of :class:`sqlite3.Connection`.
     Create these with :func:`.connect`.
@@ -234,12 +500,23 @@ class Connection:
         is automatically set to :class:`sqlite3.Row`.
         Along with :attr:`sqlite3.Connection.isolation_level`
         set to ``None`` and the journal_mode is set to ``WAL``.
+    .. note::
+        When created with ``readers``, the :meth:`fetchone`, :meth:`fetchmany`
+        and :meth:`fetchall` shortcuts run ``SELECT`` queries on one of the
+        read-only reader connections instead of the writer, unless a
+        transaction is open on the writer. Readers only see committed data.
     """
 
-    def __init__(self, connection, queue):
+    #: How many rows cursors fetch at a time when iterated with ``async for``
+    chunk_size = 256
+
+    def __init__(self, connection, queue, readers=()):
         self._conn = connection
         self._queue = queue
-        self._post = queue.post
+        self._post = queue.submit
+        self._readers = list(readers)
+        self._reader_cycle = itertools.cycle(self._readers)
+        self.query_stats = None
 
     async def __aenter__(self):
         return self
@@ -251,6 +528,50 @@ class Connection:
         """Retrieves the internal :class:`sqlite3.Connection` object."""
         return self._conn
 
+    @contextlib.contextmanager
+    def priority(self, priority):
+        """Sets the priority of the queries made inside this ``with`` block by the current task.
+
+        One of :data:`PRIORITY_HIGH`, :data:`PRIORITY_NORMAL` (the default) or :data:`PRIORITY_LOW`.
+        Pending high priority queries run before any normal or low priority ones and skip backpressure.
+        """
+        token = _priority.set(priority)
+        try:
+            yield
+        finally:
+            _priority.reset(token)
+
+    async def run(self, func, *args, **kwargs):
+        """Calls ``func(connection, *args, **kwargs)`` on the worker thread.
+
+        ``connection`` is the internal :class:`sqlite3.Connection`. Useful for work that has to run
+        several statements back to back without other queries on this connection being interleaved with them.
+        """
+        return await self._post(func, self._conn, *args, **kwargs)
+
+    def instrument(self, enabled=True, *, samples=1024):
+        """Starts (or stops) recording per-statement timings on the writer and reader threads.
+
+        Returns the :class:`QueryStats` the timings are recorded to, which is also
+        available as :attr:`query_stats` while instrumentation is enabled.
+        """
+        self.query_stats = QueryStats(samples) if enabled else None
+        for worker in [self._queue, *(worker for _, worker in self._readers)]:
+            worker.query_stats = self.query_stats
+        return self.query_stats
+
+    @property
+    def queue_depth(self):
+        """The number of queries posted to the writer and readers that haven't completed yet."""
+        return self._queue.depth + sum(worker.depth for _, worker in self._readers)
+
+    def queue_stats(self):
+        """Returns the queue depth and per-priority counters and wait times (in seconds) of every worker."""
+        return {
+            'writer': self._queue.stats(),
+            'readers': [worker.stats() for _, worker in self._readers],
+        }
+
     def transaction(self):
         """Gets a transaction object.
         This can be used similarly to ``asyncpg.Transaction``.
@@ -289,9 +610,30 @@ class Connection:
 
     async def close(self):
         """Asynchronous version of :meth:`sqlite3.Connection.close`."""
-        await self._post(self._conn.close)
+        # Closing at the lowest priority lets everything already queued run first, low priority work included
+        for connection, worker in self._readers:
+            await worker.submit(connection.close, priority=PRIORITY_LOW)
+            worker.stop()
+
+        await self._post(self._conn.close, priority=PRIORITY_LOW)
         self._queue.stop()
 
+    def _route(self, query):
+        if not self._readers or self._conn.in_transaction or not _READ_ONLY_REGEX.match(query):
+            return None
+        return next(self._reader_cycle)
+
+    async def _fetch(self, method, query, parameters, size=None):
+        if len(parameters) == 1 and isinstance(parameters[0], (dict, tuple)):
+            parameters = parameters[0]
+
+        reader = self._route(query)
+        if reader is not None:
+            connection, worker = reader
+            return await worker.submit(_fetch, connection, method, query, parameters, size, sql=query)
+
+        return await self._post(_fetch, self._conn, method, query, parameters, size, sql=query)
+
     def execute(self, sql, *parameters):
         """Asynchronous version of :meth:`sqlite3.Connection.execute`.
         Note that this returns a :class:`Cursor` instead of a :class:`sqlite3.Cursor`.
@@ -299,15 +641,15 @@ class Connection:
         if len(parameters) == 1 and isinstance(parameters[0], (dict, tuple)):
             parameters = parameters[0]
 
-        factory = lambda cur: Cursor(self, cur)
-        return _ContextManagerMixin(self._queue, factory, self._conn.execute, sql, parameters)
+        factory = lambda cur: Cursor(self, cur, sql=sql)
+        return _ContextManagerMixin(self._queue, factory, self._conn.execute, sql, parameters, sql=sql)
 
     def executemany(self, sql, seq_of_parameters):
         """Asynchronous version of :meth:`sqlite3.Connection.executemany`.
         Note that this returns a :class:`Cursor` instead of a :class:`sqlite3.Cursor`.
         """
-        factory = lambda cur: Cursor(self, cur)
-        return _ContextManagerMixin(self._queue, factory, self._conn.executemany, sql, seq_of_parameters)
+        factory = lambda cur: Cursor(self, cur, sql=sql)
+        return _ContextManagerMixin(self._queue, factory, self._conn.executemany, sql, seq_of_parameters, sql=sql)
 
     def executescript(self, sql_script):
         """Asynchronous version of :meth:`sqlite3.Connection.executescript`.
@@ -318,18 +660,168 @@ class Connection:
 
     async def fetchone(self, query, *parameters):
         """Shortcut method version of :meth:`sqlite3.Cursor.fetchone` without making a cursor."""
-        async with self.execute(query, *parameters) as cursor:
-            return await cursor.fetchone()
+        return await self._fetch('one', query, parameters)
 
     async def fetchmany(self, query, *parameters, size=None):
         """Shortcut method version of :meth:`sqlite3.Cursor.fetchmany` without making a cursor."""
-        async with self.execute(query, *parameters) as cursor:
-            return await cursor.fetchmany(size)
+        return await self._fetch('many', query, parameters, size)
 
     async def fetchall(self, query, *parameters):
         """Shortcut method version of :meth:`sqlite3.Cursor.fetchall` without making a cursor."""
-        async with self.execute(query, *parameters) as cursor:
-            return await cursor.fetchall()
+        return await self._fetch('all', query, parameters)
+
+    async def iterate(self, query, *parameters, chunk_size=None):
+        """Asynchronously iterates over the rows of a query without making a cursor.
+
+        Rows are fetched ``chunk_size`` (defaults to :attr:`chunk_size`) at a time on the
+        worker thread, and ``SELECT`` queries are routed to a reader like :meth:`fetchall`.
+        """
+        if len(parameters) == 1 and isinstance(parameters[0], (dict, tuple)):
+            parameters = parameters[0]
+
+        reader = self._route(query)
+        if reader is not None:
+            connection, worker = reader
+            post = worker.submit
+        else:
+            connection, post = self._conn, self._post
+
+        cursor = Cursor(self, await post(connection.execute, query, parameters, sql=query), post=post, sql=query)
+        if chunk_size is not None:
+            cursor.chunk_size = chunk_size
+
+        try:
+            async for row in cursor:
+                yield row
+        finally:
+            await cursor.close()
+
+
+def _write_batch(connection, writes, query_stats=None):
+    # Runs on the worker thread, consecutive writes using the same statement go through one executemany
+    try:
+        connection.execute('BEGIN')
+        start = 0
+        while start < len(writes):
+            sql = writes[start][0]
+            end = start + 1
+            while end < len(writes) and writes[end][0] == sql:
+                end += 1
+
+            timer = time.perf_counter()
+            connection.executemany(sql, [parameters for _, parameters in writes[start:end]])
+            if query_stats is not None:
+                query_stats.record(sql, time.perf_counter() - timer)
+
+            start = end
+
+        timer = time.perf_counter()
+        connection.execute('COMMIT')
+        if query_stats is not None:
+            query_stats.record('COMMIT', time.perf_counter() - timer)
+    except Exception:
+        # Not just sqlite3 errors, a bad parameter (like an int too big for SQLite) fails executemany too,
+        # and a transaction left open would swallow every later write
+        if connection.in_transaction:
+            connection.execute('ROLLBACK')
+    else:
+        return [None] * len(writes)
+
+    # Something in the batch failed, so apply the writes one by one to only fail the offending ones
+    errors = []
+    for sql, parameters in writes:
+        try:
+            connection.execute(sql, parameters)
+        except Exception as e:
+            errors.append(e)
+        else:
+            errors.append(None)
+    return errors
+
+
+class WriteBatcher:
+    """Coalesces writes on a :class:`Connection` into one transaction per flush.
+
+    Writes queued with :meth:`execute` are committed together once ``interval`` seconds
+    have passed since the first pending write, or as soon as ``max_size`` writes are pending.
+    Consecutive writes with the same SQL are sent with a single ``executemany``.
+    Batches are committed in the order they were flushed, whatever their priority.
+    """
+
+    def __init__(self, connection, *, interval=0.05, max_size=500):
+        self._conn = connection
+        self._loop = connection._queue.loop
+        self.interval = interval
+        self.max_size = max_size
+        self._pending = []
+        self._handle = None
+        self._in_order = asyncio.Lock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def execute(self, sql, parameters=(), *, priority=PRIORITY_NORMAL):
+        """Queues a write.
+
+        Returns a future that resolves once the transaction containing the write is committed,
+        it can be awaited when the caller needs the write to be durable. A batch is committed
+        with the highest priority of the writes in it.
+        """
+        future = self._loop.create_future()
+        self._pending.append((sql, parameters, future, priority))
+
+        if len(self._pending) >= self.max_size:
+            self._schedule(0)
+        elif self._handle is None:
+            self._schedule(self.interval)
+
+        return future
+
+    def _schedule(self, delay):
+        if self._handle is not None:
+            self._handle.cancel()
+        self._handle = self._loop.call_later(delay, self._start_flush)
+
+    def _start_flush(self):
+        self._handle = None
+        self._loop.create_task(self._flush())
+
+    async def _flush(self):
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        writes = [(sql, parameters) for sql, parameters, _, _ in pending]
+        priority = min(priority for _, _, _, priority in pending)
+
+        # One batch at a time, otherwise a high priority batch (like a delete) could overtake an earlier
+        # normal priority one (the insert it deletes) that is still queued or held back by backpressure
+        async with self._in_order:
+            try:
+                errors = await self._conn._post(_write_batch, self._conn._conn, writes, self._conn.query_stats,
+                                                priority=priority)
+            except Exception as e:
+                errors = [e] * len(pending)
+
+        for (_, _, future, _), error in zip(pending, errors):
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    async def flush(self):
+        """Commits every pending write now."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        await self._flush()
+
+    async def close(self):
+        """Flushes the pending writes, should be called before closing the connection."""
+        await self.flush()
 
 
 def _connect_pragmas(db, **kwargs):
@@ -341,7 +833,8 @@ def _connect_pragmas(db, **kwargs):
     return connection
 
 
-def connect(database, *, init=None, timeout=None, loop=None, **kwargs):
+def connect(database, *, init=None, timeout=None, loop=None, readers=0, max_queue=None, backpressure='wait',
+            cached_statements=128, instrument=False, **kwargs):
     """asyncio-compatible version of :func:`sqlite3.connect`.
     This can be used as a regular coroutine or in an async-with statement.
     For example, both are equivalent:
@@ -358,20 +851,49 @@ def connect(database, *, init=None, timeout=None, loop=None, **kwargs):
     A special keyword-only parameter named ``init`` can be passed which allows
     one to customize the :class:`sqlite3.Connection` before it is converted
     to a :class:`Connection` object.
+    Passing ``readers`` opens that many extra read-only connections, each with its
+    own worker thread, that read queries are routed to (see :class:`Connection`).
+    Readers are ignored for in-memory databases since they can't be shared.
+    ``max_queue`` bounds how many queries can be pending on each worker, with
+    ``backpressure`` deciding whether further queries wait for a slot
+    (``'wait'``) or raise :exc:`asyncio.QueueFull` (``'raise'``).
+    ``cached_statements`` sets the size of each connection's prepared statement
+    cache and ``instrument`` enables :meth:`Connection.instrument` right away.
     """
     loop = loop or asyncio.get_event_loop()
-    queue = _Worker(loop=loop)
+    queue = _Worker(loop=loop, max_queue=max_queue, backpressure=backpressure)
     queue.start()
 
-    def factory(con):
-        return Connection(con, queue)
+    if database == ':memory:' or 'mode=memory' in str(database):
+        readers = 0
+
+    reader_workers = [_Worker(loop=loop, name='asqlite-reader-thread', max_queue=max_queue, backpressure=backpressure)
+                      for _ in range(readers)]
+    for worker in reader_workers:
+        worker.start()
+
+    def factory(connections):
+        con, reader_connections = connections
+        connection = Connection(con, queue, readers=zip(reader_connections, reader_workers))
+        if instrument:
+            connection.instrument()
+        return connection
 
-    if init is not None:
-        def new_connect(db, **kwargs):
-            con = _connect_pragmas(db, **kwargs)
+    def new_connect(db, **kwargs):
+        con = _connect_pragmas(db, **kwargs)
+        if init is not None:
             init(con)
-            return con
-    else:
-        new_connect = _connect_pragmas
 
-    return _ContextManagerMixin(queue, factory, new_connect, database, timeout=timeout, **kwargs)
+        # Readers are opened here but only ever used from their own worker thread
+        reader_connections = []
+        for _ in reader_workers:
+            reader = _connect_pragmas(db, **dict(kwargs, check_same_thread=False))
+            if init is not None:
+                init(reader)
+            reader.execute('pragma query_only=ON')
+            reader_connections.append(reader)
+
+        return con, reader_connections
+
+    return _ContextManagerMixin(queue, factory, new_connect, database, timeout=timeout,
+                                cached_statements=cached_statements, **kwargs)
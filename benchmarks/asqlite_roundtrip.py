@@ -0,0 +1,75 @@
+"""Measures the round-trip latency of a query through asqlite's worker thread.
+
+Run from the repository root:
+
+    python benchmarks/asqlite_roundtrip.py [--queries N] [--burst N] [--instrument]
+
+Prints a JSON object with the sequential per-query latency, the time to complete
+a burst of concurrent queries, and how long closing the connection takes.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asqlite  # noqa: E402
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+async def run(queries, burst, instrument):
+    conn = await asqlite.connect(':memory:', instrument=instrument)
+
+    # Warm up the worker and the statement cache
+    for _ in range(100):
+        await conn.fetchone('SELECT 1')
+
+    latencies = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        await conn.fetchone('SELECT 1')
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(conn.fetchone('SELECT 1') for _ in range(burst)))
+    burst_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await conn.close()
+    conn._queue.join()
+    close_time = time.perf_counter() - start
+
+    return {
+        'instrument': instrument,
+        'queries': queries,
+        'mean_us': statistics.mean(latencies) * 1e6,
+        'p50_us': percentile(latencies, 50) * 1e6,
+        'p99_us': percentile(latencies, 99) * 1e6,
+        'burst': burst,
+        'burst_ms': burst_time * 1e3,
+        'burst_per_query_us': burst_time / burst * 1e6,
+        'close_ms': close_time * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--burst', type=int, default=5000)
+    parser.add_argument('--instrument', action='store_true', help='record per-statement timings while running')
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.queries, args.burst, args.instrument)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Measures how fast duration arguments like ``10m`` or ``1h30m`` are parsed.
+
+Run from the repository root (needs discord.py installed, no token or network):
+
+    python benchmarks/duration_parser.py [--tokens N] [--distinct N]
+
+Compares the parsing ``TimeConverter`` used to do (a fresh ``re.findall`` and a chain of
+list lookups for the unit) with :class:`DurationParser`, both with its cache emptied before
+every token and with it warm, on a stream of ``--tokens`` arguments drawn from ``--distinct``
+different phrases. Prints a JSON object with the nanoseconds per token for each, the cache
+statistics, and the phrases the two parsers read differently.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes import DurationParser, Time, TimeUnit  # noqa: E402
+
+COMMON = ['10m', '5m', '1h', '30mins', '2d', '1h30m', '5hr', '45s', '1mo', '1w', '2 hours', '15min', '1y',
+          '3days', '12h', '20m', '90s', '1d12h', '2 days, 5 hours', 'in', 'me']
+
+
+def old_get_unit(text):
+    text = text.lower()
+
+    if text in ['s', 'sec', 'secs', 'second', 'seconds']:
+        return TimeUnit('second', 1)
+    if text in ['m', 'min', 'mins', 'minute', 'minutes']:
+        return TimeUnit('minute', 60)
+    if text in ['h', 'hr', 'hrs', 'hour', 'hours']:
+        return TimeUnit('hour', 3600)
+    if text in ['d', 'day', 'days']:
+        return TimeUnit('day', 86_400)
+    if text in ['w', 'wk', 'wks', 'week', 'weeks']:
+        return TimeUnit('week', 604_800)
+    if text in ['mo', 'mos', 'month', 'months']:
+        return TimeUnit('month', 2_592_000)
+    if text in ['y', 'yr', 'yrs', 'year', 'years']:
+        return TimeUnit('year', 31_536_000)
+    return None
+
+
+def old_parse(argument):
+    argument = argument.replace(',', '')
+
+    if argument.lower() in ['in', 'me']: return None
+
+    try:
+        amount, unit = [re.findall(r'(\d+)(\w+?)', argument)[0]][0]
+
+        unit = old_get_unit(unit)
+        unit_correct_name = unit.name if amount == '1' else unit.name + 's'
+        seconds = unit.seconds * int(amount)
+    except Exception:
+        return None
+
+    return (Time(amount, unit_correct_name, unit, seconds),)
+
+
+def new_parse(argument):
+    if argument.lower() in ('in', 'me'): return None
+    return DurationParser.parse(argument)
+
+
+def cold_parse(argument):
+    DurationParser._parse.cache_clear()
+    return new_parse(argument)
+
+
+def measure(func, tokens, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for token in tokens:
+            func(token)
+        best = min(best, time.perf_counter_ns() - start)
+
+    return best / len(tokens)
+
+
+def describe(parts):
+    return None if parts is None else ' '.join(f'{part} ({part.seconds}s)' for part in parts)
+
+
+def run(count, distinct):
+    rng = random.Random(0)
+    units = ['s', 'm', 'min', 'mins', 'h', 'hr', 'hours', 'd', 'days', 'w', 'mo', 'y']
+
+    # Most arguments are a handful of common phrases, the rest a long tail of other amounts
+    phrases = list(COMMON)
+    while len(phrases) < distinct:
+        phrases.append(f'{rng.randint(1, 500)}{rng.choice(units)}')
+    weights = [50 if phrase in COMMON else 1 for phrase in phrases]
+    tokens = rng.choices(phrases, weights=weights, k=count)
+
+    result = {
+        'tokens': count,
+        'distinct': len(set(tokens)),
+        'old_ns_per_token': measure(old_parse, tokens),
+        'cold_ns_per_token': measure(cold_parse, tokens),
+    }
+
+    DurationParser._parse.cache_clear()
+    for token in tokens:
+        new_parse(token)
+    result['warm_ns_per_token'] = measure(new_parse, tokens)
+    result['cache'] = DurationParser._parse.cache_info()._asdict()
+
+    result['differences'] = {phrase: {'old': describe(old_parse(phrase)), 'new': describe(new_parse(phrase))}
+                             for phrase in COMMON + ['0m', '5hello']
+                             if describe(old_parse(phrase)) != describe(new_parse(phrase))}
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=200000)
+    parser.add_argument('--distinct', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.tokens, args.distinct), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""Replays a synthetic message stream through ``CustomBot.on_message``.
+
+Run from the repository root (needs discord.py installed, no token or network):
+
+    python benchmarks/message_pipeline.py [--messages N] [--guilds N] [--seed N] [--prefix-cache-size N]
+
+The bot gets a real ``ConnectionState`` filled with fake guilds, channels and members,
+a temporary database and an HTTP client whose send/reaction calls return canned payloads.
+The stream mixes chat messages, pings and the ``remind``, ``reminders``, ``delete`` and
+``prefix`` commands across the guilds (following each guild's prefix as it changes).
+
+Prints a JSON object with the messages per second, the mean time per message of each
+type, and the total time spent in each stage of the pipeline. Stages nest, the time in
+``process_commands`` includes the ``get_context`` and ``invoke`` calls made inside it.
+"""
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord  # noqa: E402
+
+import asqlite  # noqa: E402
+from classes import CustomBot, IdAllocator, PrefixClass  # noqa: E402
+
+BOT_ID = 812140712803827742
+TIMESTAMP = '2021-06-01T00:00:00.000000+00:00'
+WEIGHTS = {'chat': 70, 'ping': 5, 'remind': 10, 'reminders': 6, 'delete': 6, 'prefix': 3}
+
+snowflakes = itertools.count(10 ** 17)
+
+
+def user_payload(user_id):
+    return {'id': str(user_id), 'username': f'user{user_id % 10000}', 'discriminator': '0001', 'avatar': None}
+
+
+def message_payload(channel_id, guild_id, author_id, content, mentions=()):
+    return {'id': str(next(snowflakes)), 'channel_id': str(channel_id), 'guild_id': str(guild_id),
+            'author': user_payload(author_id),
+            'member': {'roles': [], 'joined_at': TIMESTAMP, 'deaf': False, 'mute': False},
+            'content': content, 'timestamp': TIMESTAMP, 'edited_timestamp': None, 'tts': False,
+            'mention_everyone': False, 'mentions': [user_payload(user_id) for user_id in mentions],
+            'mention_roles': [], 'attachments': [], 'embeds': [], 'pinned': False, 'type': 0}
+
+
+def guild_payload(guild_id, channel_ids):
+    return {'id': str(guild_id), 'name': f'guild{guild_id % 10000}', 'owner_id': str(BOT_ID), 'member_count': 2,
+            'roles': [{'id': str(guild_id), 'name': '@everyone', 'permissions': str(discord.Permissions.all().value),
+                       'position': 0, 'color': 0, 'hoist': False, 'managed': False, 'mentionable': False}],
+            'channels': [{'id': str(channel_id), 'type': 0, 'name': f'channel{i}', 'position': i,
+                          'permission_overwrites': []} for i, channel_id in enumerate(channel_ids)],
+            'members': [{'user': user_payload(BOT_ID), 'roles': [], 'joined_at': TIMESTAMP,
+                         'deaf': False, 'mute': False}]}
+
+
+class FakeHTTP:
+    """Stands in for the few REST calls the commands make."""
+
+    def __init__(self, http):
+        self._http = http
+        self.calls = collections.Counter()
+
+    def __getattr__(self, name):
+        return getattr(self._http, name)
+
+    async def send_message(self, channel_id, content, *, embed=None, **kwargs):
+        self.calls['send_message'] += 1
+        data = message_payload(channel_id, 0, BOT_ID, content or '')
+        del data['guild_id'], data['member']
+        data['embeds'] = [embed] if embed else []
+        return data
+
+    async def add_reaction(self, *args):
+        self.calls['add_reaction'] += 1
+
+    async def remove_reaction(self, *args):
+        self.calls['remove_reaction'] += 1
+
+    async def clear_reactions(self, *args):
+        self.calls['clear_reactions'] += 1
+
+    async def delete_message(self, *args, **kwargs):
+        self.calls['delete_message'] += 1
+
+
+class StageTimer:
+    def __init__(self):
+        self.totals = collections.Counter()
+        self.counts = collections.Counter()
+
+    def wrap(self, name, func):
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.totals[name] += time.perf_counter() - start
+                self.counts[name] += 1
+
+        return wrapper
+
+    def wrap_sync(self, name, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[name] += time.perf_counter() - start
+                self.counts[name] += 1
+
+        return wrapper
+
+
+async def make_bot(database, guilds, prefix_cache_size):
+    bot = CustomBot(case_insensitive=True, command_prefix='$', strip_after_prefix=True, max_messages=None)
+    bot.http = FakeHTTP(bot.http)
+    state = bot._connection
+    state.http = bot.http
+    state.user = discord.ClientUser(state=state, data=user_payload(BOT_ID))
+
+    # What CustomBot.startup does once the bot is ready
+    bot.db = await asqlite.connect(database, readers=2, check_same_thread=False)
+    bot.writer = asqlite.WriteBatcher(bot.db, interval=0)
+    await bot.migrate()
+    bot.reminder_ids = IdAllocator(bot.db, 'reminders')
+    bot.prefix = PrefixClass(bot.db, BOT_ID, cache_size=prefix_cache_size)
+    bot.command_prefix = bot.prefix.bot_get_prefix
+    await bot.prefix.load_prefixes()
+
+    bot.load_extension('cogs.remind')
+    bot.load_extension('cogs.misc')
+
+    layout = {}
+    for _ in range(guilds):
+        guild_id = next(snowflakes)
+        channel_ids = [next(snowflakes) for _ in range(3)]
+        state._add_guild_from_data(guild_payload(guild_id, channel_ids))
+        layout[guild_id] = (channel_ids, [next(snowflakes) for _ in range(20)])
+
+    return bot, layout
+
+
+def make_stream(bot, layout, count, rng):
+    state = bot._connection
+    prefixes = {}
+    kinds = rng.choices(list(WEIGHTS), weights=list(WEIGHTS.values()), k=count)
+    stream = []
+
+    for kind in kinds:
+        guild_id = rng.choice(list(layout))
+        channel_ids, authors = layout[guild_id]
+        channel = state._get_guild(guild_id).get_channel(rng.choice(channel_ids))
+        prefix = prefixes.get(guild_id, '$')
+        mentions = ()
+
+        if kind == 'chat':
+            content = ' '.join(rng.choice(['hello', 'how', 'are', 'you', 'doing', 'today', 'lol', 'ok'])
+                               for _ in range(rng.randint(1, 12)))
+        elif kind == 'ping':
+            content, mentions = f'<@!{BOT_ID}>', (BOT_ID,)
+        elif kind == 'remind':
+            target = f'<#{rng.choice(channel_ids)}> ' if rng.random() < 0.5 else ''
+            content = f'{prefix}remind {rng.randint(1, 59)}m {rng.randint(1, 5)}h {target}take a break'
+        elif kind == 'reminders':
+            content = f'{prefix}reminders'
+        elif kind == 'delete':
+            content = f'{prefix}delete {rng.randint(1, 1000)}'
+        else:
+            new_prefix = rng.choice(['$', '!', '?', 'r!'])
+            content = f'{prefix}prefix {new_prefix}'
+            prefixes[guild_id] = new_prefix
+
+        data = message_payload(channel.id, guild_id, rng.choice(authors), content, mentions)
+        stream.append((kind, discord.Message(state=state, channel=channel, data=data)))
+
+    return stream
+
+
+async def run(messages, guilds, seed, prefix_cache_size):
+    directory = tempfile.mkdtemp()
+    bot, layout = await make_bot(os.path.join(directory, 'data.db'), guilds, prefix_cache_size)
+    stream = make_stream(bot, layout, messages, random.Random(seed))
+
+    timer = StageTimer()
+    for name in ('get_prefix', 'get_context', 'process_commands', 'invoke'):
+        setattr(bot, name, timer.wrap(name, getattr(bot, name)))
+
+    errors = collections.Counter()
+
+    async def on_command_error(ctx, error):
+        errors[type(error).__name__] += 1
+
+    bot.on_command_error = on_command_error
+
+    permissions_for = discord.TextChannel.permissions_for
+    discord.TextChannel.permissions_for = timer.wrap_sync('permissions_for', permissions_for)
+
+    per_kind = collections.defaultdict(list)
+    try:
+        start = time.perf_counter()
+        for kind, message in stream:
+            message_start = time.perf_counter()
+            await bot.on_message(message)
+            per_kind[kind].append(time.perf_counter() - message_start)
+        elapsed = time.perf_counter() - start
+    finally:
+        discord.TextChannel.permissions_for = permissions_for
+
+    for task in asyncio.all_tasks() - {asyncio.current_task()}:
+        task.cancel()
+
+    await bot.writer.close()
+    await bot.db.close()
+
+    return {
+        'messages': messages,
+        'guilds': guilds,
+        'elapsed_s': elapsed,
+        'messages_per_s': messages / elapsed,
+        'mean_us_by_type': {kind: sum(times) / len(times) * 1e6 for kind, times in sorted(per_kind.items())},
+        'count_by_type': {kind: len(times) for kind, times in sorted(per_kind.items())},
+        'stage_total_ms': {name: total * 1e3 for name, total in sorted(timer.totals.items())},
+        'stage_calls': dict(sorted(timer.counts.items())),
+        'rest_calls': dict(sorted(bot.http.calls.items())),
+        'command_errors': dict(sorted(errors.items())),
+        'prefix_cache': {'size': prefix_cache_size, 'hits': bot.prefix.hits, 'misses': bot.prefix.misses,
+                         'evictions': bot.prefix.evictions, 'hit_rate': bot.prefix.hit_rate},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--guilds', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--prefix-cache-size', type=int, help='fetch prefixes lazily into an LRU of this size')
+    args = parser.parse_args()
+
+    # The cogs print when they load and seconds_to_str prints, keep that out of the results
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = asyncio.run(run(args.messages, args.guilds, args.seed, args.prefix_cache_size))
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Measures the per-message cost of resolving and matching a guild's prefixes.
+
+Run from the repository root (needs discord.py installed, no token or network):
+
+    python benchmarks/prefix_matcher.py [--guilds N] [--messages N]
+
+Compares building ``commands.when_mentioned_or(prefix)`` for every message (what the bot
+used to do) with :class:`PrefixClass`'s prebuilt per-guild tuples, loaded up front or held
+in its lazy LRU, for both resolving the prefixes and testing a message against them.
+Prints a JSON object with the nanoseconds per message and the bytes allocated while
+handling a message for each.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discord.ext import commands  # noqa: E402
+
+from classes import PrefixClass  # noqa: E402
+
+BOT_ID = 812140712803827742
+
+
+def old_get_prefix(prefixes, bot, message):
+    prefix = None
+    if message.guild: prefix = prefixes.get(message.guild.id)
+    prefix = prefix or '$'
+
+    return commands.when_mentioned_or(prefix)(bot, message)
+
+
+def old_matches(prefixes, bot, message):
+    # discord.py turned the returned list into a tuple to test it
+    return message.content.startswith(tuple(old_get_prefix(prefixes, bot, message)))
+
+
+def peak_allocated(func, messages):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    for message in messages:
+        func(message)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak - before
+
+
+def measure(func, messages, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for message in messages:
+            func(message)
+        best = min(best, time.perf_counter_ns() - start)
+
+    # Anything allocated while handling a message is freed right after, so the peak shows it.
+    # The peak of a loop that does nothing is subtracted, it's tracemalloc's and the loop's own
+    baseline = peak_allocated(lambda message: None, messages[:1000])
+    peak = peak_allocated(func, messages[:1000])
+
+    return {'ns_per_message': best / len(messages), 'bytes_allocated': max(peak - baseline, 0)}
+
+
+def run(guilds, count):
+    rng = random.Random(0)
+    bot = types.SimpleNamespace(user=types.SimpleNamespace(id=BOT_ID, mention=f'<@{BOT_ID}>'))
+
+    prefixes = {}
+    # One guild in four has its own prefix, the rest use the default
+    for guild_id in range(guilds):
+        if guild_id % 4 == 0:
+            prefixes[guild_id] = rng.choice(['!', '?', 'r!', '>>'])
+
+    prefix = PrefixClass(None, BOT_ID)
+    prefix._compiled = {guild_id: prefix.compile(p) for guild_id, p in prefixes.items()}
+
+    # The lazy LRU with every guild already fetched, so this is its hit path
+    lazy = PrefixClass(None, BOT_ID, cache_size=guilds)
+    for guild_id in range(guilds):
+        lazy._store(guild_id, lazy.compile(prefixes.get(guild_id)))
+
+    guild_objects = [types.SimpleNamespace(id=guild_id) for guild_id in range(guilds)]
+    contents = ['hello there', '$remind 10m stretch', '!reminders', f'<@!{BOT_ID}> help', 'lol']
+    messages = [types.SimpleNamespace(guild=rng.choice(guild_objects), content=rng.choice(contents))
+                for _ in range(count)]
+
+    return {
+        'guilds': guilds,
+        'messages': count,
+        'when_mentioned_or_get_prefix': measure(lambda m: old_get_prefix(prefixes, bot, m), messages),
+        'when_mentioned_or_match': measure(lambda m: old_matches(prefixes, bot, m), messages),
+        'compiled_get_prefix': measure(lambda m: prefix.prefixes_for(m.guild), messages),
+        'compiled_match': measure(prefix.matches, messages),
+        'lru_get_prefix': measure(lambda m: lazy.prefixes_for(m.guild), messages),
+        'lru_match': measure(lazy.matches, messages),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--guilds', type=int, default=10000)
+    parser.add_argument('--messages', type=int, default=200000)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.guilds, args.messages), indent=2))
+
+
+if __name__ == '__main__':
+    main()
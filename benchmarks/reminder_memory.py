@@ -0,0 +1,73 @@
+"""Measures how much memory each pending reminder costs.
+
+Run from the repository root (needs discord.py installed, no token or network):
+
+    python benchmarks/reminder_memory.py [--reminders N]
+
+Schedules N reminders against a fake bot and prints a JSON object with the bytes
+allocated per reminder, including its scheduler heap entry and ``bot.reminders`` slot.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes import ReminderScheduler  # noqa: E402
+import cogs.remind as remind  # noqa: E402
+
+
+class FakeBot:
+    def __init__(self):
+        self.reminders = {}
+        self.scheduler = ReminderScheduler(lambda reminders: None, horizon=10 ** 9)
+        self.scheduler.advance_window()
+
+    def owns(self, key):
+        return True
+
+
+async def run(count):
+    remind.bot = FakeBot()
+    now = int(time.time())
+
+    # Build the inputs first so only the reminders themselves are measured
+    texts = [f'Reminder text number {i:07d}' for i in range(count)]
+    ids = [10 ** 17 + i for i in range(count)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    for i in range(count):
+        remind.Reminder(i + 1, ids[i], 2 * 10 ** 17 + i % 1000, texts[i], 3 * 10 ** 17 + i % 100, now + 3600 + i)
+
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    reminder = next(iter(remind.bot.reminders.values()))
+    object_size = sys.getsizeof(reminder)
+    if hasattr(reminder, '__dict__'):
+        object_size += sys.getsizeof(reminder.__dict__)
+
+    return {
+        'reminders': count,
+        'bytes_per_reminder': (after - before) / count,
+        'object_size': object_size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reminders', type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.reminders)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Runs several delivery worker processes against one database and checks each reminder is sent once.
+
+Run from the repository root (needs discord.py installed, no token or network):
+
+    python benchmarks/reminder_workers.py [--reminders N] [--processes N] [--kill]
+
+Fills a temporary database with due reminders, starts worker processes with a fake sender
+and prints a JSON object with the throughput and how many reminders were sent twice or never.
+With ``--kill`` one worker is killed partway through, so its leases have to expire and be
+claimed by the others. A reminder the killed worker sent but hadn't deleted yet is sent again.
+"""
+
+import argparse
+import asyncio
+import collections
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asqlite  # noqa: E402
+from classes import CustomBot  # noqa: E402
+from reminderworker import FakeSender, run_process  # noqa: E402
+
+
+async def fill(database, count):
+    db = await asqlite.connect(database)
+    await CustomBot.migrate(types.SimpleNamespace(db=db))
+
+    now = int(time.time())
+    # Every third reminder is a DM, the rest go to one of 50 channels
+    rows = [(i, 10 ** 17 + i % 500, str(i), now - 1, 10 ** 17 + i % 500 if i % 3 == 0 else 2 * 10 ** 17 + i % 50)
+            for i in range(count)]
+    await db.executemany('INSERT INTO reminders (id, user_id, reminder, end_time, destination) VALUES (?, ?, ?, ?, ?)',
+                         rows)
+    await db.close()
+
+
+def run(count, processes, kill, lease, batch, latency):
+    directory = tempfile.mkdtemp()
+    database = os.path.join(directory, 'data.db')
+    asyncio.run(fill(database, count))
+
+    options = {'exit_when_idle': True, 'lease': lease, 'batch': batch, 'poll': 0.05}
+    workers = [multiprocessing.Process(target=run_process,
+                                       args=(database, FakeSender(os.path.join(directory, f'sent-{i}.jsonl'),
+                                                                  latency=latency), options))
+               for i in range(processes)]
+
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+
+    if kill:
+        time.sleep(0.5)
+        workers[0].kill()
+
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    sends = collections.Counter()
+    for path in glob.glob(os.path.join(directory, 'sent-*.jsonl')):
+        with open(path) as file:
+            for line in file:
+                sends[int(json.loads(line)['embed']['description'])] += 1
+
+    return {
+        'reminders': count,
+        'processes': processes,
+        'killed_worker': kill,
+        'elapsed_s': elapsed,
+        'reminders_per_s': count / elapsed,
+        'sent': sum(sends.values()),
+        'sent_twice': sum(1 for n in sends.values() if n > 1),
+        'never_sent': count - len(sends),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reminders', type=int, default=5000)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--kill', action='store_true', help='kill one worker partway through')
+    parser.add_argument('--lease', type=int, default=2, help='seconds a claimed reminder stays leased')
+    parser.add_argument('--batch', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.01, help='seconds each fake send takes')
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.reminders, args.processes, args.kill, args.lease, args.batch, args.latency), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""Load-tests the reminder scheduling path with many pending reminders.
+
+Run from the repository root (needs discord.py installed, no token or network):
+
+    python benchmarks/scheduler_load.py [--sizes 10000,100000,1000000] [--fire N] [--spread SECONDS]
+
+For each size N, against a fake bot and fake destinations:
+
+- creates N pending reminders through ``Reminder`` and reports the creation throughput,
+- repeats that under tracemalloc and reports the bytes allocated per reminder,
+- with the N reminders still pending, lets ``--fire`` more reminders come due over ``--spread``
+  seconds and reports how late (actual minus ``end_time``) they reach the scheduler callback
+  and the fake destinations, as p50/p99,
+- loads N reminders from a SQLite database with ``Reminder.load_reminders`` and reports how
+  long that rehydration takes.
+
+Prints a JSON list with one object per size.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asqlite  # noqa: E402
+from classes import CustomBot, ReminderScheduler  # noqa: E402
+import cogs.remind as remind  # noqa: E402
+
+USERS = 10000
+CHANNELS = 1000
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))] if samples else None
+
+
+class FakeDestination:
+    def __init__(self, id, deliveries):
+        self.id = id
+        self.mention = f'<@{id}>'
+        self.avatar_url = ''
+        self.deliveries = deliveries
+
+    def __str__(self):
+        return f'User {self.id}'
+
+    async def send(self, content=None, *, embed=None):
+        now = time.time()
+        # Each reminder's text is its end_time
+        if embed.fields:
+            self.deliveries.extend(now - int(field.value) for field in embed.fields)
+        else:
+            self.deliveries.append(now - int(embed.description))
+
+
+class FakeWriter:
+    async def execute(self, *args, **kwargs):
+        pass
+
+
+class FakeBot:
+    shard_ids = None
+    shard_filter = '1'
+
+    def __init__(self, db=None):
+        self.db = db
+        self.writer = FakeWriter()
+        self.reminders = {}
+        self.scheduler = ReminderScheduler(self.dispatch, horizon=10 ** 9)
+        self.scheduler.advance_window()
+        self.dispatched = []
+        self.deliveries = []
+        self.destinations = {}
+        self.cog = remind.ReminderCog.__new__(remind.ReminderCog)
+        self.cog.bot = self
+        self.cog.delivery = remind.ReminderDelivery()
+
+    def owns(self, key):
+        return True
+
+    def dispatch(self, reminders):
+        now = time.time()
+        self.dispatched.extend(now - reminder.end_time for reminder in reminders)
+        asyncio.ensure_future(self.cog.on_reminders_due(reminders))
+
+    def get_user(self, user_id):
+        destination = self.destinations.get(user_id)
+        if destination is None:
+            destination = self.destinations[user_id] = FakeDestination(user_id, self.deliveries)
+        return destination
+
+    get_channel = get_user
+
+    async def resolve_user(self, user_id):
+        return self.get_user(user_id)
+
+    async def send_dm(self, user_id, content=None, *, embed=None):
+        await self.get_user(user_id).send(content, embed=embed)
+
+
+def reminder_args(count, start):
+    # Every tenth reminder is a DM, the rest go to one of CHANNELS channels
+    args = []
+    for i in range(count):
+        user_id = 10 ** 17 + i % USERS
+        destination_id = user_id if i % 10 == 0 else 2 * 10 ** 17 + i % CHANNELS
+        args.append((i + 1, 3 * 10 ** 17 + i, user_id, 'x' * 40, destination_id, start + i % 86400))
+    return args
+
+
+def create(bot, args):
+    remind.bot = bot
+    start = time.perf_counter()
+    for reminder_args_ in args:
+        remind.Reminder(*reminder_args_)
+    return time.perf_counter() - start
+
+
+async def measure_lateness(bot, count, fire, spread):
+    remind.bot = bot
+    now = int(time.time())
+    for i in range(fire):
+        user_id = 10 ** 17 + i % USERS
+        destination_id = user_id if i % 10 == 0 else 2 * 10 ** 17 + i % CHANNELS
+        end_time = now + 1 + i * spread // fire
+        remind.Reminder(count + i + 1, 0, user_id, str(end_time), destination_id, end_time)
+
+    bot.scheduler.start()
+    deadline = time.time() + spread + 30
+    while len(bot.deliveries) < fire and time.time() < deadline:
+        await asyncio.sleep(0.1)
+    bot.scheduler.stop()
+    bot.cog.delivery.close()
+
+    return {
+        'fired': len(bot.dispatched),
+        'dispatch_lateness_p50_ms': percentile(bot.dispatched, 50) * 1e3,
+        'dispatch_lateness_p99_ms': percentile(bot.dispatched, 99) * 1e3,
+        'delivered': len(bot.deliveries),
+        'delivery_lateness_p50_ms': percentile(bot.deliveries, 50) * 1e3,
+        'delivery_lateness_p99_ms': percentile(bot.deliveries, 99) * 1e3,
+    }
+
+
+async def measure_rehydration(args):
+    directory = tempfile.mkdtemp()
+    database = os.path.join(directory, 'data.db')
+
+    db = await asqlite.connect(database)
+    await CustomBot.migrate(FakeBot(db))
+    await db.close()
+
+    with sqlite3.connect(database) as connection:
+        connection.executemany('INSERT INTO reminders (id, message_id, user_id, reminder, destination, end_time) '
+                               'VALUES (?, ?, ?, ?, ?, ?)', args)
+
+    db = await asqlite.connect(database, readers=1)
+    bot = FakeBot(db)
+    bot.scheduler.loaded_until = 0
+    remind.bot = bot
+
+    start = time.perf_counter()
+    await remind.Reminder.load_reminders()
+    elapsed = time.perf_counter() - start
+
+    loaded = len(bot.reminders)
+    await db.close()
+    return elapsed, loaded
+
+
+async def run(count, fire, spread):
+    args = reminder_args(count, int(time.time()) + 3600)
+
+    bot = FakeBot()
+    create_time = create(bot, args)
+    lateness = await measure_lateness(bot, count, fire, spread)
+    del bot
+    gc.collect()
+
+    bot = FakeBot()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    create(bot, args)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del bot
+    gc.collect()
+
+    rehydrate_time, loaded = await measure_rehydration(args)
+
+    return {
+        'reminders': count,
+        'create_s': create_time,
+        'create_per_s': count / create_time,
+        'bytes_per_reminder': (after - before) / count,
+        **lateness,
+        'rehydrate_s': rehydrate_time,
+        'rehydrate_per_s': loaded / rehydrate_time,
+        'rehydrated': loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='comma separated pending reminder counts')
+    parser.add_argument('--fire', type=int, default=10000, help='reminders that come due during the run')
+    parser.add_argument('--spread', type=int, default=5, help='seconds the due reminders are spread over')
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(int(size), args.fire, args.spread)) for size in args.sizes.split(',')]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
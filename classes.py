@@ -1,12 +1,18 @@
 import re
 import discord
 import asqlite
+import asyncio
+import heapq
+import sqlite3
 import time
 
+from collections import OrderedDict
 from dataclasses import dataclass
+from functools import lru_cache, partial
 from discord.ext import commands, menus
 
-__all__ = ['embed_create', 'CustomBot', 'TimeConverter', 'MentionedTextChannel', 'CustomMenu', 'seconds_to_str']
+__all__ = ['embed_create', 'CustomBot', 'ReminderScheduler', 'IdAllocator', 'DurationParser', 'TimeConverter',
+           'MentionedTextChannel', 'CustomMenu', 'seconds_to_str']
 
 
 def embed_create(user, **kwargs):
@@ -51,52 +57,423 @@ def seconds_to_str(seconds):
     return '%d Seconds' % (seconds,)
 
 
-class CustomBot(commands.Bot):
+# Applied in order by CustomBot.migrate, the index of each script + 1 is stored as the ``user_version``
+MIGRATIONS = [
+    '''
+    CREATE TABLE IF NOT EXISTS "prefixes" (
+        "guild_id"  INTEGER UNIQUE,
+        "prefix"    TEXT,
+        PRIMARY KEY("guild_id")
+    );
+    CREATE TABLE IF NOT EXISTS "reminders" (
+        "id"            INTEGER UNIQUE,
+        "user_id"       INTEGER,
+        "reminder"      TEXT,
+        "end_time"      INTEGER,
+        "destination"   INTEGER,
+        PRIMARY KEY("id")
+    );
+    CREATE INDEX IF NOT EXISTS "reminders_end_time" ON "reminders" ("end_time");
+    ''',
+    # Reminder IDs become small persisted integers, the message ID moves to its own column
+    '''
+    DROP INDEX IF EXISTS "reminders_end_time";
+    ALTER TABLE "reminders" RENAME TO "reminders_old";
+    CREATE TABLE "reminders" (
+        "id"            INTEGER PRIMARY KEY AUTOINCREMENT,
+        "message_id"    INTEGER UNIQUE,
+        "user_id"       INTEGER,
+        "reminder"      TEXT,
+        "end_time"      INTEGER,
+        "destination"   INTEGER
+    );
+    INSERT INTO "reminders" ("message_id", "user_id", "reminder", "end_time", "destination")
+        SELECT "id", "user_id", "reminder", "end_time", "destination" FROM "reminders_old" ORDER BY "end_time";
+    DROP TABLE "reminders_old";
+    CREATE INDEX "reminders_end_time" ON "reminders" ("end_time");
+    INSERT INTO "sqlite_sequence" ("name", "seq")
+        SELECT 'reminders', 0 WHERE NOT EXISTS (SELECT 1 FROM "sqlite_sequence" WHERE "name" = 'reminders');
+    ''',
+    # Per-user index, SQLite appends the rowid (the reminder ID) so it's ordered by (user_id, end_time, id)
+    '''
+    CREATE INDEX IF NOT EXISTS "reminders_user" ON "reminders" ("user_id", "end_time");
+    ''',
+    # Delivery attempts, a failed reminder is retried by moving its end_time forward
+    '''
+    ALTER TABLE "reminders" ADD COLUMN "attempts" INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE "reminders" ADD COLUMN "last_error" TEXT;
+    ''',
+    # DM channel IDs, so sending a DM doesn't have to open the channel first
+    '''
+    CREATE TABLE IF NOT EXISTS "dm_channels" (
+        "user_id"       INTEGER PRIMARY KEY,
+        "channel_id"    INTEGER NOT NULL
+    );
+    ''',
+    # Destination guild, reminders are split between shards by it (NULL for DMs and older reminders)
+    '''
+    ALTER TABLE "reminders" ADD COLUMN "guild_id" INTEGER;
+    ''',
+    # Leases for delivery workers, a reminder is only sent by the worker holding an unexpired lease on it
+    '''
+    ALTER TABLE "reminders" ADD COLUMN "lease_owner" TEXT;
+    ALTER TABLE "reminders" ADD COLUMN "lease_expires" INTEGER;
+    ''',
+    # Claimed rows are looked up by their lease, only leased rows are indexed so the index stays small
+    '''
+    CREATE INDEX IF NOT EXISTS "reminders_lease" ON "reminders" ("lease_owner") WHERE "lease_owner" IS NOT NULL;
+    ''',
+]
+
+
+class CustomBot(commands.AutoShardedBot):
 
     def __init__(self, **kwargs):
+        reminder_horizon = kwargs.pop('reminder_horizon', 3600)
+        self.catchup_rate = kwargs.pop('catchup_rate', 10)
+        self.deliver_reminders = kwargs.pop('deliver_reminders', True)
+        self.prefix_cache_size = kwargs.pop('prefix_cache_size', None)
         super().__init__(**kwargs)
         self.start_time = time.time()
         self.db = None
+        self.writer = None
+        self.reminder_ids = None
         self.reminders = {}
+        self.scheduler = ReminderScheduler(partial(self.dispatch, 'reminders_due'), horizon=reminder_horizon)
         self.startup_tasks = []
         self.prefix = None
+        self._user_fetches = {}
+        self.dm_channels = {}
+        self.dm_channel_hits = 0
+        self.dm_channel_misses = 0
+        self._user_fetch_semaphore = asyncio.Semaphore(8)
         self.loop.create_task(self.startup())
 
     async def startup(self):
         await self.wait_until_ready()
         print('Bot is ready!')
 
-        self.db: asqlite.Connection = await asqlite.connect('data.db', check_same_thread=False)
-        self.prefix: PrefixClass = PrefixClass(self.db)
+        self.db: asqlite.Connection = await asqlite.connect('data.db', readers=2, max_queue=1000,
+                                                              check_same_thread=False)
+        self.writer: asqlite.WriteBatcher = asqlite.WriteBatcher(self.db)
+        await self.migrate()
+        self.reminder_ids: IdAllocator = IdAllocator(self.db, 'reminders')
+        self.prefix: PrefixClass = PrefixClass(self.db, self.user.id, cache_size=self.prefix_cache_size)
         self.command_prefix = self.prefix.bot_get_prefix
         await self.prefix.load_prefixes()
 
         for task in self.startup_tasks:
             await task()
 
+        self.scheduler.start()
+
+    async def migrate(self):
+        await self.db.run(_migrate, MIGRATIONS)
+
+    def owns(self, key):
+        """Whether reminders partitioned under ``key`` belong to the shards run by this process.
+
+        Reminders are partitioned by their destination guild the same way Discord assigns guilds to shards,
+        DM reminders (and reminders saved before the guild was stored) by their destination ID instead.
+        Without ``shard_ids`` every shard runs in this process, so it owns every reminder.
+        """
+        return self.shard_ids is None or (key >> 22) % self.shard_count in self.shard_ids
+
+    @property
+    def shard_filter(self):
+        """SQL condition matching the ``reminders`` rows :meth:`owns` is true for."""
+        if self.shard_ids is None:
+            return '1'
+
+        shard_ids = ', '.join(map(str, self.shard_ids))
+        return f'((COALESCE(guild_id, destination) >> 22) % {self.shard_count}) IN ({shard_ids})'
+
+    async def resolve_user(self, user_id):
+        """Gets a user from the cache, falling back to :meth:`fetch_user`.
+
+        Concurrent lookups of the same user share one request and at most 8 requests run at once.
+        Returns ``None`` if the user doesn't exist.
+        """
+        user = self.get_user(user_id)
+        if user is not None:
+            return user
+
+        future = self._user_fetches.get(user_id)
+        if future is None:
+            future = self._user_fetches[user_id] = asyncio.ensure_future(self._fetch_user(user_id))
+            future.add_done_callback(lambda _: self._user_fetches.pop(user_id, None))
+
+        return await asyncio.shield(future)
+
+    async def _fetch_user(self, user_id):
+        async with self._user_fetch_semaphore:
+            try:
+                return await self.fetch_user(user_id)
+            except discord.NotFound:
+                return None
+
+    async def dm_channel_id(self, user_id, *, refresh=False):
+        """Gets the ID of the DM channel with a user, only opening one if it isn't known yet.
+
+        Known channels come from memory, discord.py's cache or the ``dm_channels`` table, and are
+        counted in :attr:`dm_channel_hits`. Channels that had to be opened are counted in :attr:`dm_channel_misses`.
+        With ``refresh`` the known channel is skipped and a new one is opened.
+        """
+        channel_id = None if refresh else self.dm_channels.get(user_id)
+
+        if channel_id is None and not refresh:
+            channel = self._connection._get_private_channel_by_user(user_id)
+            if channel is not None:
+                channel_id = channel.id
+            else:
+                row = await self.db.fetchone('SELECT channel_id FROM dm_channels WHERE user_id = (?)', (user_id,))
+                channel_id = row and row['channel_id']
+
+        if channel_id is not None:
+            self.dm_channel_hits += 1
+        else:
+            self.dm_channel_misses += 1
+            data = await self.http.start_private_message(user_id)
+            channel_id = int(data['id'])
+            await self.writer.execute('REPLACE INTO dm_channels VALUES (?, ?)', (user_id, channel_id))
+
+        self.dm_channels[user_id] = channel_id
+        return channel_id
+
+    async def send_dm(self, user_id, content=None, *, embed=None):
+        """Sends a DM straight to the user's DM channel, without needing the user object."""
+        channel_id = await self.dm_channel_id(user_id)
+
+        try:
+            await self.http.send_message(channel_id, content, embed=embed and embed.to_dict())
+        except discord.NotFound:
+            # The stored channel is gone, so a new one is opened (replacing the stored one) and the DM sent again
+            channel_id = await self.dm_channel_id(user_id, refresh=True)
+            await self.http.send_message(channel_id, content, embed=embed and embed.to_dict())
+
+    async def get_prefix(self, message):
+        # The prebuilt tuple is used as is, instead of discord.py copying the prefixes into a new list
+        if self.prefix is None:
+            return await super().get_prefix(message)
+
+        return await self.prefix.fetch_prefixes(message.guild)
+
+    def could_be_command(self, message):
+        """Cheap check for whether a message starts with one of its prefixes, without building a context."""
+        return self.prefix is None or self.prefix.matches(message)
+
     async def on_message(self, message):
         if message.author.bot:
             return
 
-        if (await self.get_context(message)).valid and message.guild:
-            if not message.channel.permissions_for(message.guild.me).embed_links:
-                return await message.channel.send(f":x: This bot needs the ``Embed Links`` "
-                                                  f"permission to function!")
-
-        if message.content in [f"<@!{self.user.id}>", f"<@{self.user.id}>"]:
-            prefix = self.prefix.get_custom_prefix(message.guild)
+        if message.content in (f"<@!{self.user.id}>", f"<@{self.user.id}>"):
+            prefix = (await self.prefix.fetch_prefixes(message.guild))[-1]
             embed = embed_create(message.author,
                                  title='Pinged!',
                                  description=f'The current prefixes are `{prefix}` and {self.user.mention}')
-            await message.channel.send(embed=embed)
+            return await message.channel.send(embed=embed)
+
+        # Most messages aren't commands, those are dropped before any parsing
+        if not self.could_be_command(message):
+            return
+
+        # The context is only built once, for both the permission check and running the command
+        ctx = await self.get_context(message)
+
+        if ctx.valid and message.guild:
+            if not message.channel.permissions_for(message.guild.me).embed_links:
+                return await message.channel.send(f":x: This bot needs the ``Embed Links`` "
+                                                  f"permission to function!")
 
-        await self.process_commands(message)
+        await self.invoke(ctx)
 
     async def close(self):
+        self.scheduler.stop()
+        await self.writer.close()
         await self.db.close()
         await super().close()
 
 
+def _statements(script):
+    statement = ''
+    for part in script.split(';')[:-1]:
+        statement += part + ';'
+        # A ; inside a string literal doesn't end the statement
+        if sqlite3.complete_statement(statement):
+            yield statement
+            statement = ''
+
+
+def _migrate(connection, migrations):
+    # The version is read inside the write lock, so processes starting together don't both apply the same scripts.
+    # executescript would commit the transaction, so the scripts are run one statement at a time
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        version = connection.execute('PRAGMA user_version').fetchone()[0]
+
+        for version, script in enumerate(migrations[version:], start=version + 1):
+            for statement in _statements(script):
+                connection.execute(statement)
+            connection.execute(f'PRAGMA user_version = {version}')
+    except Exception:
+        connection.execute('ROLLBACK')
+        raise
+    connection.execute('COMMIT')
+
+
+def _reserve_ids(connection, table, count):
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        connection.execute('UPDATE sqlite_sequence SET seq = seq + ? WHERE name = ?', (count, table))
+        end = connection.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,)).fetchone()[0]
+    except Exception:
+        connection.execute('ROLLBACK')
+        raise
+    connection.execute('COMMIT')
+    return end - count + 1, end + 1
+
+
+class IdAllocator:
+    """Hands out IDs for an ``AUTOINCREMENT`` table.
+
+    IDs are reserved in blocks by bumping the table's ``sqlite_sequence`` row in one
+    transaction, and handed out from memory until the block runs out. IDs are never
+    reused, not even after a restart or by another process using the same database.
+    """
+
+    def __init__(self, db, table, *, block_size=32):
+        self.db = db
+        self.table = table
+        self.block_size = block_size
+        self._next = self._end = 0
+        self._lock = asyncio.Lock()
+
+    async def next(self):
+        async with self._lock:
+            if self._next >= self._end:
+                with self.db.priority(asqlite.PRIORITY_HIGH):
+                    self._next, self._end = await self.db.run(_reserve_ids, self.table, self.block_size)
+
+            self._next += 1
+            return self._next - 1
+
+
+class ReminderScheduler:
+    """Keeps pending reminders in a min-heap keyed by ``end_time``.
+
+    A single dispatcher task sleeps until the earliest reminder is due, pops every reminder
+    that is due at that point and hands the batch to ``callback``. Cancelling is lazy, the
+    heap entry is only marked as removed and gets skipped (or compacted away) later.
+
+    Only reminders due within ``horizon`` seconds are meant to be held here, everything due
+    before :attr:`loaded_until` has been loaded and later reminders stay in the database
+    until :meth:`advance_window` moves the window over them.
+
+    Keys have to be unique and orderable, they break ties between reminders ending at the same time.
+    """
+
+    _REMOVED = object()
+
+    def __init__(self, callback, *, horizon=3600):
+        self.callback = callback
+        self.horizon = horizon
+        self.loaded_until = 0
+        self._heap = []
+        self._entries = {}
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._dispatcher())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def covers(self, end_time):
+        """Whether a reminder ending at ``end_time`` falls inside the loaded window."""
+        return end_time < self.loaded_until
+
+    def advance_window(self):
+        """Moves the window forward, returning the ``(start, end)`` range that still has to be loaded."""
+        start, self.loaded_until = self.loaded_until, max(self.loaded_until, int(time.time()) + self.horizon)
+        return start, self.loaded_until
+
+    def schedule(self, key, end_time, item):
+        """Schedules ``item`` to be dispatched at ``end_time``, replacing any entry with the same key."""
+        if key in self._entries:
+            self.cancel(key)
+
+        entry = [end_time, key, item]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+        if self._heap[0] is entry:
+            self._wakeup.set()
+
+    def cancel(self, key):
+        """Cancels the entry with this key in O(1), returning its item or ``None``."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+
+        item, entry[-1] = entry[-1], self._REMOVED
+
+        # Rebuild once most of the heap is dead entries, so cancelled reminders don't pile up
+        if len(self._heap) > 64 and len(self._entries) < len(self._heap) // 2:
+            self._heap = [e for e in self._heap if e[-1] is not self._REMOVED]
+            heapq.heapify(self._heap)
+
+        return item
+
+    def _pop_removed(self):
+        heap = self._heap
+        while heap and heap[0][-1] is self._REMOVED:
+            heapq.heappop(heap)
+
+    def _pop_due(self, now):
+        heap = self._heap
+        due = []
+
+        self._pop_removed()
+        while heap and heap[0][0] <= now:
+            _, key, item = heapq.heappop(heap)
+            del self._entries[key]
+            due.append(item)
+            self._pop_removed()
+
+        return due
+
+    async def _dispatcher(self):
+        while True:
+            self._wakeup.clear()
+            self._pop_removed()
+
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = self._pop_due(time.time())
+            if due:
+                self.callback(due)
+
+
 @dataclass(frozen=True)
 class TimeUnit:
     name: str
@@ -114,46 +491,66 @@ class Time:
         return f'{self.unit_amount} {self.unit_name}'
 
 
-class TimeConverter(commands.Converter):
+class DurationParser:
+    """Parses durations like ``10m``, ``1h30m`` or ``2 days, 5 hours`` into :class:`Time` parts in one pass.
+
+    Units are looked up in a dict of their aliases. Parsed phrases are memoized (in a bounded LRU),
+    the :class:`Time` parts are frozen so the same ones are handed out every time a phrase repeats.
+    """
+
+    UNITS = {alias: unit
+             for unit, aliases in ((TimeUnit('second', 1), ('s', 'sec', 'secs', 'second', 'seconds')),
+                                   (TimeUnit('minute', 60), ('m', 'min', 'mins', 'minute', 'minutes')),
+                                   (TimeUnit('hour', 3600), ('h', 'hr', 'hrs', 'hour', 'hours')),
+                                   (TimeUnit('day', 86_400), ('d', 'day', 'days')),
+                                   (TimeUnit('week', 604_800), ('w', 'wk', 'wks', 'week', 'weeks')),
+                                   (TimeUnit('month', 2_592_000), ('mo', 'mos', 'month', 'months')),
+                                   (TimeUnit('year', 31_536_000), ('y', 'yr', 'yrs', 'year', 'years')))
+             for alias in aliases}
+
+    PART_REGEX = re.compile(r'[\s,]*(\d+)\s*([a-z]+)[\s,]*')
+
+    @classmethod
+    def parse(cls, phrase: str):
+        """Returns a tuple of the phrase's :class:`Time` parts, or ``None`` if it isn't a valid duration."""
+        return cls._parse(phrase.lower())
+
     @staticmethod
-    def get_unit(text: str):
-        text = text.lower()
-
-        if text in ['s', 'sec', 'secs', 'second', 'seconds']:
-            return TimeUnit('second', 1)
-        if text in ['m', 'min', 'mins', 'minute', 'minutes']:
-            return TimeUnit('minute', 60)
-        if text in ['h', 'hr', 'hrs', 'hour', 'hours']:
-            return TimeUnit('hour', 3600)
-        if text in ['d', 'day', 'days']:
-            return TimeUnit('day', 86_400)
-        if text in ['w', 'wk', 'wks', 'week', 'weeks']:
-            return TimeUnit('week', 604_800)
-        if text in ['mo', 'mos', 'month', 'months']:
-            return TimeUnit('month', 2_592_000)
-        if text in ['y', 'yr', 'yrs', 'year', 'years']:
-            return TimeUnit('year', 31_536_000)
-        return None
+    @lru_cache(maxsize=4096)
+    def _parse(phrase):
+        match_part, units = DurationParser.PART_REGEX.match, DurationParser.UNITS
+        parts = []
+        position = 0
 
-    async def convert(self, _, argument: str):
+        while position < len(phrase):
+            match = match_part(phrase, position)
+            if match is None:
+                return None
 
-        argument = argument.replace(',', '')
+            amount, unit = int(match[1]), units.get(match[2])
+            if unit is None or amount == 0:
+                return None
 
-        if argument.lower() in ['in', 'me']: return None
+            parts.append(Time(amount, unit.name if amount == 1 else unit.name + 's', unit, unit.seconds * amount))
+            position = match.end()
 
-        try:
-            amount, unit = [re.findall(r'(\d+)(\w+?)', argument)[0]][0]
+        return tuple(parts) or None
+
+
+class TimeConverter(commands.Converter):
+    @staticmethod
+    def get_unit(text: str):
+        return DurationParser.UNITS.get(text.lower())
+
+    async def convert(self, _, argument: str):
 
-            if amount == 0:
-                raise commands.BadArgument('Amount can\'t be zero')
+        if argument.lower() in ('in', 'me'): return None
 
-            unit = self.get_unit(unit)
-            unit_correct_name = unit.name if amount == '1' else unit.name + 's'
-            seconds = unit.seconds * int(amount)
-        except Exception:
+        durations = DurationParser.parse(argument)
+        if durations is None:
             raise commands.BadArgument()
 
-        return Time(amount, unit_correct_name, unit, seconds)
+        return durations
 
 
 ID_REGEX = re.compile(r'([0-9]{15,20})$')
@@ -183,35 +580,98 @@ class CustomMenu(menus.MenuPages):
 
 
 class PrefixClass:
-    def __init__(self, db: asqlite.Connection):
-        self.db = db
-        self.prefixes: {int: str} = {}
+    """Keeps every guild's prefixes as a prebuilt tuple, only rebuilt when the guild's prefix changes.
 
-    def bot_get_prefix(self, bot, msg):
-        prefix = None
-        if msg.guild: prefix = self.prefixes.get(msg.guild.id)
-        prefix = prefix or '$'
+    The tuples hold the mention forms first, like :func:`commands.when_mentioned_or`, so they
+    can be handed to discord.py and passed to :meth:`str.startswith` as they are.
 
-        return commands.when_mentioned_or(prefix)(bot, msg)
+    By default every custom prefix is loaded at startup. With ``cache_size`` set, a guild's prefix is
+    only fetched the first time it's needed and kept in an LRU of at most ``cache_size`` guilds,
+    guilds using the default prefix included so they aren't fetched again. Lookups are counted in
+    :attr:`hits`, :attr:`misses` and :attr:`evictions`.
+    """
 
-    def get_custom_prefix(self, guild=None):
-        prefix = None
-        if guild: prefix = self.prefixes.get(guild.id)
-        prefix = prefix or '$'
+    def __init__(self, db: asqlite.Connection, user_id: int, *, cache_size: int = None):
+        self.db = db
+        self.cache_size = cache_size
+        self.mentions = (f'<@{user_id}> ', f'<@!{user_id}> ')
+        self.default = self.mentions + ('$',)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._compiled: {int: tuple} = OrderedDict() if cache_size else {}
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def compile(self, prefix):
+        return self.mentions + (prefix,) if prefix else self.default
+
+    def _store(self, guild_id, prefixes):
+        self._compiled[guild_id] = prefixes
+        if self.cache_size:
+            self._compiled.move_to_end(guild_id)
+            if len(self._compiled) > self.cache_size:
+                self._compiled.popitem(last=False)
+                self.evictions += 1
+
+    def prefixes_for(self, guild=None):
+        """The guild's prefix tuple, or ``None`` if it hasn't been fetched into the cache yet."""
+        if guild is None:
+            return self.default
+
+        if not self.cache_size:
+            return self._compiled.get(guild.id, self.default)
+
+        prefixes = self._compiled.get(guild.id)
+        if prefixes is not None:
+            self.hits += 1
+            self._compiled.move_to_end(guild.id)
+
+        return prefixes
+
+    async def fetch_prefixes(self, guild=None):
+        """The guild's prefix tuple, fetching it from the database if it isn't cached."""
+        if guild is None:
+            return self.default
+
+        prefixes = self._compiled.get(guild.id)
+        if prefixes is None:
+            if not self.cache_size:
+                return self.default
+
+            self.misses += 1
+            row = await self.db.fetchone('SELECT prefix FROM prefixes WHERE guild_id = (?)', (guild.id,))
+            prefixes = self.compile(row and row[0])
+            self._store(guild.id, prefixes)
+
+        return prefixes
+
+    def matches(self, message):
+        """Whether a message starts with one of its guild's prefixes (or might, if they aren't cached yet)."""
+        prefixes = self.prefixes_for(message.guild)
+        return prefixes is None or message.content.startswith(prefixes)
+
+    async def bot_get_prefix(self, bot, msg):
+        return await self.fetch_prefixes(msg.guild)
 
-        return prefix
+    def get_custom_prefix(self, guild=None):
+        prefixes = self._compiled.get(guild.id) if guild else None
+        return prefixes[-1] if prefixes else '$'
 
     async def set_custom_prefix(self, guild, prefix):
-        async with self.db.cursor() as cursor:
-            await cursor.execute("REPLACE INTO prefixes VALUES(?, ?)", (guild.id, prefix))
+        with self.db.priority(asqlite.PRIORITY_HIGH):
+            async with self.db.cursor() as cursor:
+                await cursor.execute("REPLACE INTO prefixes VALUES(?, ?)", (guild.id, prefix))
 
-        self.prefixes[guild.id] = prefix
+        self._store(guild.id, self.compile(prefix))
         await self.db.commit()
 
     async def load_prefixes(self):
-        prefixes: {int: str} = {}
-        async with self.db.cursor() as cursor:
-            for row in await cursor.execute("SELECT guild_id, prefix FROM prefixes"):
-                prefixes[row[0]] = row[1]
+        if self.cache_size:
+            return
 
-        self.prefixes = prefixes
+        self._compiled = {row[0]: self.compile(row[1])
+                          for row in await self.db.fetchall("SELECT guild_id, prefix FROM prefixes") if row[1]}
@@ -1,130 +1,521 @@
 import discord
 from discord import TextChannel, User
-from discord.ext import commands, menus
+from discord.ext import commands, menus, tasks
 from discord.ext.commands import Greedy
 
+import aiohttp
+import asqlite
 import asyncio
+import random
 import time
+import traceback
 from datetime import datetime
 
-from typing import Optional, Union
-
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
 
 from classes import *
 
 bot: Union[CustomBot, None] = None
 
 
-class ReminderList(menus.ListPageSource):
+class ReminderList(menus.PageSource):
+    # Pages are fetched from the database as they're shown, keyed off the (end_time, id) of the neighbouring page,
+    # so only pages that were actually looked at are held while the menu is open
+    _COLUMNS = 'id, reminder, end_time, destination, attempts'
+
+    def __init__(self, user_id: int, count: int, *, per_page: int = 5):
+        self.user_id = user_id
+        self.count = count
+        self.per_page = per_page
+        self._max_pages = max(-(-count // per_page), 1)
+        self._pages = {}
+        self._embeds = {}
+
+    def is_paginating(self):
+        return self.count > self.per_page
+
+    def get_max_pages(self):
+        return self._max_pages
+
+    async def _fetch_page(self, page_number):
+        if page_number == 0:
+            return await bot.db.fetchall(f'SELECT {self._COLUMNS} FROM reminders WHERE user_id = (?) '
+                                         'ORDER BY end_time, id LIMIT (?)', (self.user_id, self.per_page))
+
+        before = self._pages.get(page_number - 1)
+        if before:
+            last = before[-1]
+            return await bot.db.fetchall(f'SELECT {self._COLUMNS} FROM reminders WHERE user_id = (?) '
+                                         'AND (end_time, id) > (?, ?) ORDER BY end_time, id LIMIT (?)',
+                                         (self.user_id, last['end_time'], last['id'], self.per_page))
+
+        after = self._pages.get(page_number + 1)
+        if after:
+            first = after[0]
+            rows = await bot.db.fetchall(f'SELECT {self._COLUMNS} FROM reminders WHERE user_id = (?) '
+                                         'AND (end_time, id) < (?, ?) ORDER BY end_time DESC, id DESC LIMIT (?)',
+                                         (self.user_id, first['end_time'], first['id'], self.per_page))
+            return rows[::-1]
+
+        if page_number == self._max_pages - 1:
+            remaining = self.count - page_number * self.per_page
+            rows = await bot.db.fetchall(f'SELECT {self._COLUMNS} FROM reminders WHERE user_id = (?) '
+                                         'ORDER BY end_time DESC, id DESC LIMIT (?)', (self.user_id, remaining))
+            return rows[::-1]
+
+        return await bot.db.fetchall(f'SELECT {self._COLUMNS} FROM reminders WHERE user_id = (?) '
+                                     'ORDER BY end_time, id LIMIT (?) OFFSET (?)',
+                                     (self.user_id, self.per_page, page_number * self.per_page))
+
+    async def get_page(self, page_number):
+        rows = self._pages.get(page_number)
+        if rows is None:
+            rows = self._pages[page_number] = await self._fetch_page(page_number)
+        return rows
+
     async def format_page(self, menu, entries):
+        embed = self._embeds.get(menu.current_page)
+        if embed is not None:
+            return embed
+
         index = menu.current_page + 1
         embed = embed_create(menu.ctx.author, title=f'Showing active reminders for {menu.ctx.author} '
                                                     f'({index}/{self._max_pages}):')
 
-        for reminder in entries:
-            channel = reminder.destination if isinstance(reminder.destination, TextChannel) else None
-            date = datetime.utcfromtimestamp(reminder.end_time)
+        for row in entries:
+            channel = bot.get_channel(row['destination'])
+            date = datetime.utcfromtimestamp(row['end_time'])
             ends_in = (date - datetime.utcnow()).total_seconds()
 
-            embed.add_field(name=f'ID: {reminder.id}',
-                            value=f'**Reminder:** {str(reminder)[:1100]}\n'
+            embed.add_field(name=f'ID: {row["id"]}',
+                            value=f'**Reminder:** {row["reminder"][:1100]}\n'
                                   f'**Ends at:** {date.strftime("%b %d, %Y, %I:%M:%S %p UTC")}\n'
                                   f'**Ends in:** {seconds_to_str(ends_in)}\n'
-                                  f'**Destination:** {channel.mention if channel else "Your DMS!"}\n',
+                                  f'**Destination:** {channel.mention if channel else "Your DMS!"}\n' +
+                                  (f'**Delivery attempts:** {row["attempts"]}\n' if row['attempts'] else ''),
                             inline=False)
+
+        self._embeds[menu.current_page] = embed
         return embed
 
 
-@dataclass
 class Reminder:
-    message_id: int
-    user: User
-    reminder: str
-    destination: Union[User, TextChannel]
-    end_time: int
-    id: int = field(init=False)
-    duration: int = field(init=False)
-    task: asyncio.Future = field(init=False)
-
-    def __post_init__(self):
-        self.duration = 1 if self.end_time - time.time() <= 0 else self.end_time - time.time()
-        self.id = len(bot.reminders) + 1
-        self.task = asyncio.ensure_future(self.send_reminder())
-        bot.reminders[self.id] = self
-
-    async def send_reminder(self):
-        async with bot.db.cursor() as cursor:
-            await cursor.execute('INSERT OR IGNORE INTO reminders VALUES (?, ?, ?, ?, ?)',
-                                 (self.message_id,
-                                  self.user.id,
+    # Only IDs are kept, discord objects are resolved when the reminder is sent
+    __slots__ = ('id', 'message_id', 'user_id', 'reminder', 'destination_id', 'end_time', 'attempts', 'guild_id')
+
+    # Failed deliveries are retried after RETRY_BASE, 2 * RETRY_BASE, ... seconds, capped at RETRY_MAX
+    MAX_ATTEMPTS = 6
+    RETRY_BASE = 30
+    RETRY_MAX = 3600
+
+    def __init__(self, id: int, message_id: int, user_id: int, reminder: str, destination_id: int, end_time: int,
+                 attempts: int = 0, guild_id: Optional[int] = None):
+        self.id = id
+        self.message_id = message_id
+        self.user_id = user_id
+        self.reminder = reminder
+        self.destination_id = destination_id
+        self.end_time = end_time
+        self.attempts = attempts
+        self.guild_id = guild_id
+
+        self.schedule()
+
+    def schedule(self):
+        # Reminders past the loaded window only live in the database until the window reaches them,
+        # reminders owned by another process's shards are left for that process to load
+        if bot.scheduler.covers(self.end_time) and bot.owns(self.shard_key):
+            bot.reminders[self.id] = self
+            bot.scheduler.schedule(self.id, self.end_time, self)
+
+    @property
+    def is_dm(self):
+        return self.destination_id == self.user_id
+
+    @property
+    def shard_key(self):
+        return self.guild_id if self.guild_id is not None else self.destination_id
+
+    async def save(self):
+        await bot.writer.execute('INSERT OR IGNORE INTO reminders '
+                                 '(id, message_id, user_id, reminder, end_time, destination, guild_id) '
+                                 'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                 (self.id,
+                                  self.message_id,
+                                  self.user_id,
                                   self.reminder,
                                   self.end_time,
-                                  self.destination.id)
+                                  self.destination_id,
+                                  self.guild_id)
                                  )
-        await bot.db.commit()
-        await asyncio.sleep(self.duration)
 
+        # The window can move past end_time while the row waits to be written, the scan that loaded
+        # that part of the window couldn't see it yet, so it's scheduled here instead
+        if self.id not in bot.reminders:
+            self.schedule()
+
+    def to_embed(self, user: Optional[User]):
         embed = discord.Embed(title='Reminder!',
                               description=self.reminder,
                               color=discord.Color.green())
         embed.timestamp = datetime.utcnow()
 
-        if isinstance(self.destination, TextChannel):
-            embed.set_footer(icon_url=self.user.avatar_url,
-                             text=f'Reminder sent by {self.user}')
-        else:
-            embed.set_footer(icon_url=self.user.avatar_url,
+        icon_url = user.avatar_url if user else discord.Embed.Empty
+        if self.is_dm:
+            embed.set_footer(icon_url=icon_url,
                              text=f'This reminder is sent by you!')
+        else:
+            embed.set_footer(icon_url=icon_url,
+                             text=f'Reminder sent by {user}')
 
-        try:
-            await self.destination.send(
-                f"**Hey {self.user.mention},**" if isinstance(self.destination, TextChannel) else None,
-                embed=embed)
-        except (discord.Forbidden, discord.HTTPException):
-            pass
-        finally:
-            await self.remove()
+        return embed
+
+    async def retry(self, error: Exception):
+        self.attempts += 1
+        if self.attempts >= Reminder.MAX_ATTEMPTS:
+            return await self.remove()
+
+        # Jittered, so reminders that failed together don't all come back at the same moment
+        delay = min(Reminder.RETRY_BASE * 2 ** (self.attempts - 1), Reminder.RETRY_MAX)
+        self.end_time = int(time.time()) + delay + random.randint(0, delay // 4)
+
+        await bot.writer.execute('UPDATE reminders SET end_time = (?), attempts = (?), last_error = (?) WHERE id = (?)',
+                                 (self.end_time, self.attempts, f'{type(error).__name__}: {error}'[:500], self.id),
+                                 priority=asqlite.PRIORITY_HIGH)
+
+        if bot.scheduler.covers(self.end_time):
+            bot.scheduler.schedule(self.id, self.end_time, self)
+        else:
+            bot.scheduler.cancel(self.id)
+            bot.reminders.pop(self.id, None)
 
     async def remove(self):
-        async with bot.db.cursor() as cursor:
-            await cursor.execute('DELETE FROM reminders WHERE id = (?)', (self.message_id,))
-        await bot.db.commit()
-        bot.reminders[self.id] = None
-        del self
+        bot.scheduler.cancel(self.id)
+        await Reminder.delete(self.id)
+        bot.reminders.pop(self.id, None)
+
+    @staticmethod
+    async def delete(reminder_id):
+        await bot.writer.execute('DELETE FROM reminders WHERE id = (?)', (reminder_id,),
+                                 priority=asqlite.PRIORITY_HIGH)
+
+    @staticmethod
+    async def load_reminders(since: Optional[int] = None):
+        window_start, end = bot.scheduler.advance_window()
+        start = window_start
+
+        # Other processes can add reminders this process owns (DMs are owned by the user's shard, not the shard
+        # the command was used in), so with several processes the whole window is scanned again each time.
+        # The scan starts where the last one did, so reminders that came due in between are found too
+        if bot.shard_ids is not None:
+            start = min(start, int(time.time()) if since is None else since)
+
+        try:
+            with bot.db.priority(asqlite.PRIORITY_LOW):
+                async for row in bot.db.iterate(f'SELECT * FROM reminders WHERE end_time >= (?) AND end_time < (?) '
+                                                f'AND {bot.shard_filter} ORDER BY end_time', (start, end)):
+                    if row['id'] not in bot.reminders:
+                        Reminder.from_row(row)
+        except BaseException:
+            # The window only counts as loaded once the scan finished, so the next scan covers it again.
+            # It's moved forward before scanning so reminders made during the scan are scheduled by Reminder()
+            bot.scheduler.loaded_until = window_start
+            raise
 
     @staticmethod
-    async def load_reminders():
-        async with bot.db.cursor() as cursor:
-            for row in await cursor.execute('SELECT * FROM reminders'):
-                message_id: int = row[0]
-                try:
-                    user: User = await bot.fetch_user(row[1])
-                except discord.NotFound:
-                    user: None = None
-                reminder: str = row[2]
-                end_time: int = row[3]
-                destination: Union[User, TextChannel] = bot.get_channel(row[4]) or user
-
-                if destination is None or user is None:
-                    await cursor.execute('DELETE FROM reminders WHERE id = (?)', (message_id,))
-                    await bot.db.commit()
-                    continue
-
-                Reminder(message_id, user, reminder, destination, end_time)
+    def from_row(row):
+        return Reminder(row['id'], row['message_id'], row['user_id'], row['reminder'], row['destination'],
+                        row['end_time'], row['attempts'], row['guild_id'])
 
     def __str__(self):
         return self.reminder
 
+    def __repr__(self):
+        return f'<Reminder id={self.id} user_id={self.user_id} end_time={self.end_time}>'
+
+
+class ReminderDelivery:
+    # Due reminders are held for a short window and grouped by destination, so a burst for one channel or DM
+    # goes out as a few packed messages instead of one send each. Each destination has a single sender task
+    # which spaces its sends out by `interval`, keeping under the per-channel rate limit instead of running into 429s
+    MAX_FIELDS = 25
+    MAX_FIELD_LENGTH = 1024
+    MAX_EMBED_LENGTH = 5500  # Below Discord's 6000 so the title and footer always fit
+
+    def __init__(self, *, window: float = 0.25, interval: float = 1.0):
+        self.window = window
+        self.interval = interval
+        self._pending: Dict[int, List[Reminder]] = {}
+        self._senders: Dict[int, asyncio.Task] = {}
+
+    def __len__(self):
+        return sum(len(reminders) for reminders in self._pending.values())
+
+    def submit(self, reminder: Reminder):
+        self._pending.setdefault(reminder.destination_id, []).append(reminder)
+
+        if reminder.destination_id not in self._senders:
+            self._senders[reminder.destination_id] = asyncio.create_task(self._sender(reminder.destination_id))
+
+    def close(self):
+        for task in self._senders.values():
+            task.cancel()
+
+        # Reminders that were waiting are out of the scheduler, so they're let go of and sent from their row later
+        for reminders in self._pending.values():
+            for reminder in reminders:
+                bot.reminders.pop(reminder.id, None)
+
+        self._pending.clear()
+
+    @classmethod
+    def chunk(cls, reminders: List[Reminder]):
+        chunk, length = [], 0
+        for reminder in reminders:
+            size = min(len(reminder.reminder), cls.MAX_FIELD_LENGTH) + 64
+            if chunk and (len(chunk) == cls.MAX_FIELDS or length + size > cls.MAX_EMBED_LENGTH):
+                yield chunk
+                chunk, length = [], 0
+
+            chunk.append(reminder)
+            length += size
+
+        if chunk:
+            yield chunk
+
+    async def _sender(self, destination_id: int):
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.sleep(self.window)
+
+            # Reminders that come due while this destination is being sent to are picked up on the next pass
+            while reminders := self._pending.pop(destination_id, None):
+                for chunk in self.chunk(reminders):
+                    sent_at = loop.time()
+                    await self._send(chunk)
+                    await asyncio.sleep(self.interval - (loop.time() - sent_at))
+        finally:
+            del self._senders[destination_id]
+
+    @staticmethod
+    def is_transient(error: Exception):
+        # Server errors, rate limits and network trouble can succeed later, anything else (missing permissions,
+        # deleted channels, bad requests) fails the same way every time
+        if isinstance(error, discord.HTTPException):
+            return error.status >= 500 or error.status == 429
+
+        return True
+
+    @staticmethod
+    async def _send(reminders: List[Reminder]):
+        # Reminders deleted while they waited to be sent are no longer the ones held in bot.reminders
+        reminders = [reminder for reminder in reminders if bot.reminders.get(reminder.id) is reminder]
+        if not reminders:
+            return
+
+        try:
+            if bot.shard_ids is not None:
+                # The delete command runs in whichever process got the message, so drop reminders deleted meanwhile
+                placeholders = ', '.join('?' * len(reminders))
+                rows = await bot.db.fetchall(f'SELECT id FROM reminders WHERE id IN ({placeholders})',
+                                             tuple(reminder.id for reminder in reminders))
+                live = {row['id'] for row in rows}
+                for reminder in reminders:
+                    if reminder.id not in live:
+                        bot.reminders.pop(reminder.id, None)
+
+                reminders = [reminder for reminder in reminders if reminder.id in live]
+                if not reminders:
+                    return
+
+            is_dm = reminders[0].is_dm
+            if is_dm:
+                # DMs go straight to the stored DM channel, the user is only needed (if cached) for the footer
+                user: Optional[User] = bot.get_user(reminders[0].user_id)
+                found = [(reminder, user) for reminder in reminders]
+                channel: Optional[TextChannel] = None
+            else:
+                users: List[Optional[User]] = await asyncio.gather(*(bot.resolve_user(r.user_id) for r in reminders))
+                found = [(reminder, user) for reminder, user in zip(reminders, users) if user is not None]
+                channel = bot.get_channel(reminders[0].destination_id)
+
+                # None of the users exist anymore
+                if not found:
+                    return await asyncio.gather(*(reminder.remove() for reminder in reminders))
+
+            if len(found) == 1:
+                embed = found[0][0].to_embed(found[0][1])
+            else:
+                embed = discord.Embed(title=f'{len(found)} Reminders!',
+                                      color=discord.Color.green())
+                embed.timestamp = datetime.utcnow()
+
+                for reminder, user in found:
+                    embed.add_field(name='Reminder:' if is_dm else f'Reminder from {user}:',
+                                    value=reminder.reminder[:ReminderDelivery.MAX_FIELD_LENGTH],
+                                    inline=False)
+
+                if is_dm:
+                    embed.set_footer(icon_url=found[0][1].avatar_url if found[0][1] else discord.Embed.Empty,
+                                     text=f'These reminders are sent by you!')
+
+            if is_dm:
+                await bot.send_dm(reminders[0].user_id, embed=embed)
+            else:
+                mentions = ', '.join(dict.fromkeys(user.mention for _, user in found))
+                content = f"**Hey {mentions},**"
+
+                # Channels this process's shards don't cache can still be sent to over REST
+                if channel is not None:
+                    await channel.send(content, embed=embed)
+                else:
+                    await bot.http.send_message(reminders[0].destination_id, content, embed=embed.to_dict())
+        except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError) as error:
+            if ReminderDelivery.is_transient(error):
+                await asyncio.gather(*(reminder.retry(error) for reminder in reminders))
+            else:
+                await asyncio.gather(*(reminder.remove() for reminder in reminders))
+        except BaseException:
+            # Cancelled (the cog is unloading) or a bug, nothing is known to be sent so the rows are left alone
+            for reminder in reminders:
+                bot.reminders.pop(reminder.id, None)
+            raise
+        else:
+            await asyncio.gather(*(reminder.remove() for reminder in reminders))
+
+
+class ReminderCatchUp:
+    # Reminders that came due while the bot was offline are fed to the scheduler oldest first, `rate` per second,
+    # instead of all of them firing the moment the bot starts. Reminders made after startup don't wait on this
+    RETRY_DELAY = 5
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self.backlog = 0
+        self.drained = 0
+        self._task = None
+
+    @property
+    def active(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self, cutoff: int):
+        self._task = asyncio.create_task(self._drain(cutoff))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _query(self, query: str, parameters: tuple, *, one: bool = False):
+        # Failed queries are retried, the task isn't awaited by anything so an error would stop it unnoticed
+        while True:
+            try:
+                with bot.db.priority(asqlite.PRIORITY_LOW):
+                    return await (bot.db.fetchone if one else bot.db.fetchall)(query, parameters)
+            except Exception:
+                print(f'Catching up on overdue reminders failed, retrying in {self.RETRY_DELAY} seconds')
+                traceback.print_exc()
+                await asyncio.sleep(self.RETRY_DELAY)
+
+    async def _drain(self, cutoff: int):
+        count = await self._query(f'SELECT COUNT(*) FROM reminders WHERE end_time < (?) AND {bot.shard_filter}',
+                                  (cutoff,), one=True)
+        self.backlog = count[0]
+        if not self.backlog:
+            return
+
+        print(f'Catching up on {self.backlog} overdue reminders, {self.rate} per second')
+
+        loop = asyncio.get_running_loop()
+        last_end_time, last_id = -1, -1
+
+        while True:
+            started = loop.time()
+
+            rows = await self._query(f'SELECT * FROM reminders WHERE end_time < (?) '
+                                     f'AND (end_time, id) > (?, ?) AND {bot.shard_filter} '
+                                     f'ORDER BY end_time, id LIMIT (?)',
+                                     (cutoff, last_end_time, last_id, self.rate))
+
+            for row in rows:
+                if row['id'] not in bot.reminders:
+                    Reminder.from_row(row)
+
+            self.drained += len(rows)
+            if len(rows) < self.rate:
+                break
+
+            last_end_time, last_id = rows[-1]['end_time'], rows[-1]['id']
+            if self.drained % (self.rate * 30) == 0:
+                print(f'Caught up on {self.drained}/{self.backlog} overdue reminders')
+
+            await asyncio.sleep(1 - (loop.time() - started))
+
+        print(f'Caught up on all {self.drained} overdue reminders')
+
 
 class ReminderCog(commands.Cog, name="Reminder Commands!"):
+    RESCAN_INTERVAL = 15
+    SCAN_RETRY_DELAY = 5
+    # The end of year 9999, the latest time datetime can show (and well within SQLite's 64-bit integers)
+    MAX_END_TIME = 253_402_300_799
+
     def __init__(self, _bot):
 
-        _bot.startup_tasks.append(Reminder.load_reminders)
+        _bot.startup_tasks.append(self.start_window_loader)
+
+        interval = max(_bot.scheduler.horizon // 2, 1)
+        if _bot.shard_ids is not None:
+            # Reminders other processes make for this one are only found by the next scan
+            interval = min(interval, self.RESCAN_INTERVAL)
+
+        self.window_loader.change_interval(seconds=interval)
 
         self.bot = _bot
+        self.last_scan = None
+        self.delivery = ReminderDelivery()
+        self.catch_up = ReminderCatchUp(_bot.catchup_rate)
         print('ReminderCog Init')
 
+    def cog_unload(self):
+        self.window_loader.cancel()
+        self.delivery.close()
+        self.catch_up.stop()
+
+    async def start_window_loader(self):
+        # Reminders are sent by reminderworker.py processes instead
+        if not self.bot.deliver_reminders:
+            return
+
+        # The window starts at startup, anything older is overdue and left to the catch-up task
+        cutoff = int(time.time())
+        self.bot.scheduler.loaded_until = cutoff
+        self.last_scan = cutoff
+
+        self.window_loader.start()
+        self.catch_up.start(cutoff)
+
+    @tasks.loop()
+    async def window_loader(self):
+        scanned_at = int(time.time())
+
+        # tasks.loop stops for good on most errors, so a failed scan is retried here instead
+        while True:
+            try:
+                await Reminder.load_reminders(since=self.last_scan)
+                break
+            except Exception:
+                print(f'Loading reminders failed, retrying in {self.SCAN_RETRY_DELAY} seconds')
+                traceback.print_exc()
+                await asyncio.sleep(self.SCAN_RETRY_DELAY)
+
+        self.last_scan = scanned_at
+
+    @commands.Cog.listener()
+    async def on_reminders_due(self, reminders):
+        for reminder in reminders:
+            self.delivery.submit(reminder)
+
     @commands.command(aliases=['r', 'remindme', 'reminder'],
                       usage='<duration> [channel] <reminder>')
     async def remind(self, ctx, durations: Greedy[TimeConverter], channel: Optional[MentionedTextChannel], *,
@@ -136,7 +527,8 @@ class ReminderCog(commands.Cog, name="Reminder Commands!"):
         *remind 10mins #general code discord bot*
         *remind 1hr 30m do stuff*"""
 
-        durations = [duration for duration in durations if duration]
+        # Each argument can hold several parts (1h30m), and is None for filler words like 'in'
+        durations = [duration for parts in durations if parts for duration in parts]
         durations_set = set([duration.unit for duration in durations])
 
         if not durations:
@@ -162,9 +554,14 @@ class ReminderCog(commands.Cog, name="Reminder Commands!"):
         total_seconds = sum([t.seconds for t in durations])
         end_time = int(time.time()) + total_seconds
 
+        if end_time > self.MAX_END_TIME:
+            raise commands.BadArgument('The duration is too long!')
+
         destination = channel or ctx.author
 
-        rem = Reminder(ctx.message.id, ctx.author, reminder, destination, end_time)
+        rem = Reminder(await self.bot.reminder_ids.next(), ctx.message.id, ctx.author.id, reminder, destination.id,
+                       end_time, guild_id=channel.guild.id if channel else None)
+        await rem.save()
 
         embed = embed_create(ctx.author,
                              title=f'Reminder added! (**ID**: {rem.id})',
@@ -196,10 +593,9 @@ class ReminderCog(commands.Cog, name="Reminder Commands!"):
         """Shows your active reminders that you made!
         It will show what the reminders are, when they end, and their ID"""
 
-        filtered_reminders = [reminder for reminder in self.bot.reminders.values()
-                              if reminder is not None and reminder.user == ctx.author]
+        count = await self.bot.db.fetchone('SELECT COUNT(*) FROM reminders WHERE user_id = (?)', (ctx.author.id,))
 
-        if not filtered_reminders:
+        if not count[0]:
             embed = embed_create(ctx.author,
                                  title='No reminders!',
                                  description='You don\'t have any reminders set yet, '
@@ -208,7 +604,7 @@ class ReminderCog(commands.Cog, name="Reminder Commands!"):
 
             return await ctx.send(embed=embed)
 
-        menu = CustomMenu(source=ReminderList(filtered_reminders, per_page=5), clear_reactions_after=True)
+        menu = CustomMenu(source=ReminderList(ctx.author.id, count[0], per_page=5), clear_reactions_after=True)
         await menu.start(ctx)
 
     @commands.command(aliases=['deletereminder'])
@@ -219,19 +615,27 @@ class ReminderCog(commands.Cog, name="Reminder Commands!"):
         reminder = self.bot.reminders.get(reminder_id)
 
         if reminder is None:
-            raise commands.BadArgument('A reminder with that ID wasn\'t found!')
+            row = await self.bot.db.fetchone('SELECT * FROM reminders WHERE id = (?)', (reminder_id,))
+            if row is None:
+                raise commands.BadArgument('A reminder with that ID wasn\'t found!')
 
-        if reminder.user != ctx.author:
+            reminder_user_id, reminder_text = row['user_id'], row['reminder']
+        else:
+            reminder_user_id, reminder_text = reminder.user_id, reminder.reminder
+
+        if reminder_user_id != ctx.author.id:
             embed = embed_create(ctx.author,
                                  title='You didn\'t make this reminder!',
                                  description='Someone else made this reminder, so you can\'t delete it!',
                                  color=discord.Color.red())
             return await ctx.send(embed=embed)
 
-        reminder_str = discord.utils.escape_markdown(reminder.reminder)
+        reminder_str = discord.utils.escape_markdown(reminder_text)
 
-        reminder.task.cancel()
-        await reminder.remove()
+        if reminder is None:
+            await Reminder.delete(reminder_id)
+        else:
+            await reminder.remove()
 
         embed = embed_create(ctx.author,
                              title=f'Reminder successfully removed! (ID: {reminder_id})',
@@ -0,0 +1,270 @@
+"""Standalone reminder delivery workers.
+
+Run the bot with ``deliver_reminders=False`` and as many of these as needed against the same ``data.db``:
+
+    python reminderworker.py [--processes N]
+
+Workers claim due reminders by putting a lease on their rows in one transaction, so a reminder is only
+sent by the worker holding its lease and is deleted by that worker once sent. If a worker dies its
+leases expire and the reminders are claimed by another worker.
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import time
+from datetime import datetime
+
+import aiohttp
+import asyncio
+import discord
+
+import asqlite
+from classes import MIGRATIONS
+from cogs.remind import Reminder, ReminderDelivery
+
+
+def _claim(connection, owner, now, lease, limit):
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        connection.execute('UPDATE reminders SET lease_owner = ?, lease_expires = ? WHERE id IN ('
+                           'SELECT id FROM reminders WHERE end_time <= ? '
+                           'AND (lease_expires IS NULL OR lease_expires <= ?) '
+                           'ORDER BY end_time, id LIMIT ?)', (owner, now + lease, now, now, limit))
+        rows = connection.execute('SELECT * FROM reminders WHERE lease_owner = ? ORDER BY end_time, id',
+                                  (owner,)).fetchall()
+    except Exception:
+        connection.execute('ROLLBACK')
+        raise
+    connection.execute('COMMIT')
+    return rows
+
+
+class HTTPSender:
+    """Sends messages over Discord's REST API, no gateway connection is needed."""
+
+    def __init__(self, token):
+        self.token = token
+        self.http = None
+
+    async def start(self):
+        self.http = discord.http.HTTPClient()
+        await self.http.static_login(self.token, bot=True)
+
+    async def close(self):
+        await self.http.close()
+
+    async def open_dm(self, user_id):
+        data = await self.http.start_private_message(user_id)
+        return int(data['id'])
+
+    async def send(self, channel_id, content, embed):
+        await self.http.send_message(channel_id, content, embed=embed.to_dict())
+
+
+class FakeSender:
+    """Records messages instead of sending them, for running workers without Discord.
+
+    Sends are kept in :attr:`sent` and, if ``path`` is given, appended to it as JSON lines.
+    """
+
+    def __init__(self, path=None, *, latency=0.0):
+        self.path = path
+        self.latency = latency
+        self.sent = []
+        self._file = None
+
+    async def start(self):
+        if self.path:
+            self._file = open(self.path, 'a')
+
+    async def close(self):
+        if self._file:
+            self._file.close()
+
+    async def open_dm(self, user_id):
+        return user_id + 1
+
+    async def send(self, channel_id, content, embed):
+        await asyncio.sleep(self.latency)
+
+        message = {'channel_id': channel_id, 'content': content, 'embed': embed.to_dict()}
+        self.sent.append(message)
+        if self._file:
+            self._file.write(json.dumps(message) + '\n')
+            self._file.flush()
+
+
+class ReminderWorker:
+    """Claims due reminders in batches of ``batch`` and sends them with ``sender``.
+
+    Claimed rows are leased for ``lease`` seconds, which has to be longer than sending a batch takes.
+    Failed sends are retried with the same backoff as the bot uses.
+    """
+
+    def __init__(self, db, sender, *, owner=None, lease=60, batch=50, poll=1.0):
+        self.db = db
+        self.sender = sender
+        self.owner = owner or f'{socket.gethostname()}:{os.getpid()}'
+        self.lease = lease
+        self.batch = batch
+        self.poll = poll
+        self.sent = 0
+        self.retried = 0
+        self.dropped = 0
+        self._claims = itertools.count()
+        self._dm_channels = {}
+
+    async def claim(self):
+        """Leases up to ``batch`` due reminders, returning the lease token and the claimed rows."""
+        token = f'{self.owner}:{next(self._claims)}'
+        with self.db.priority(asqlite.PRIORITY_HIGH):
+            rows = await self.db.run(_claim, token, int(time.time()), self.lease, self.batch)
+
+        return token, rows
+
+    async def run(self, *, exit_when_idle=False):
+        while True:
+            token, rows = await self.claim()
+            await asyncio.gather(*(self.deliver(token, row) for row in rows))
+
+            if len(rows) < self.batch:
+                if exit_when_idle and not rows:
+                    due = await self.db.fetchone('SELECT COUNT(*) FROM reminders WHERE end_time <= (?)',
+                                                 (int(time.time()),))
+                    if not due[0]:
+                        return
+
+                await asyncio.sleep(self.poll)
+
+    async def dm_channel_id(self, user_id, *, refresh=False):
+        channel_id = None if refresh else self._dm_channels.get(user_id)
+        if channel_id is None:
+            row = None
+            if not refresh:
+                row = await self.db.fetchone('SELECT channel_id FROM dm_channels WHERE user_id = (?)', (user_id,))
+
+            if row is not None:
+                channel_id = row['channel_id']
+            else:
+                channel_id = await self.sender.open_dm(user_id)
+                async with self.db.execute('REPLACE INTO dm_channels VALUES (?, ?)', (user_id, channel_id)):
+                    pass
+
+            self._dm_channels[user_id] = channel_id
+
+        return channel_id
+
+    @staticmethod
+    def embed(row, is_dm):
+        embed = discord.Embed(title='Reminder!',
+                              description=row['reminder'],
+                              color=discord.Color.green())
+        embed.timestamp = datetime.utcnow()
+
+        if is_dm:
+            embed.set_footer(text='This reminder is sent by you!')
+
+        return embed
+
+    async def deliver(self, token, row):
+        is_dm = row['destination'] == row['user_id']
+        try:
+            if is_dm:
+                channel_id, content = await self.dm_channel_id(row['user_id']), None
+            else:
+                channel_id, content = row['destination'], f"**Hey <@{row['user_id']}>,**"
+
+            embed = self.embed(row, is_dm)
+            try:
+                await self.sender.send(channel_id, content, embed)
+            except discord.NotFound:
+                if not is_dm:
+                    raise
+
+                # The stored DM channel is gone, so a new one is opened (replacing the stored one) and sent to
+                channel_id = await self.dm_channel_id(row['user_id'], refresh=True)
+                await self.sender.send(channel_id, content, embed)
+
+            self.sent += 1
+        except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError) as error:
+            if ReminderDelivery.is_transient(error) and row['attempts'] + 1 < Reminder.MAX_ATTEMPTS:
+                return await self.retry(token, row, error)
+
+            self.dropped += 1
+
+        # The lease check keeps a worker whose lease ran out from deleting a reminder another worker now holds
+        async with self.db.execute('DELETE FROM reminders WHERE id = (?) AND lease_owner = (?)', (row['id'], token)):
+            pass
+
+    async def retry(self, token, row, error):
+        attempts = row['attempts'] + 1
+        delay = min(Reminder.RETRY_BASE * 2 ** (attempts - 1), Reminder.RETRY_MAX)
+        end_time = int(time.time()) + delay + random.randint(0, delay // 4)
+
+        async with self.db.execute('UPDATE reminders SET end_time = (?), attempts = (?), last_error = (?), '
+                                   'lease_owner = NULL, lease_expires = NULL WHERE id = (?) AND lease_owner = (?)',
+                                   (end_time, attempts, f'{type(error).__name__}: {error}'[:500], row['id'], token)):
+            pass
+        self.retried += 1
+
+
+async def work(database, sender, *, exit_when_idle=False, **kwargs):
+    db = await asqlite.connect(database)
+    try:
+        version = (await db.fetchone('PRAGMA user_version'))[0]
+        if version < len(MIGRATIONS):
+            raise RuntimeError(f'{database} is at schema version {version}, start the bot once to migrate it')
+
+        await sender.start()
+        worker = ReminderWorker(db, sender, **kwargs)
+        try:
+            await worker.run(exit_when_idle=exit_when_idle)
+        finally:
+            await sender.close()
+
+        return worker
+    finally:
+        await db.close()
+
+
+def run_process(database, sender, options):
+    asyncio.run(work(database, sender, **options))
+
+
+def spawn(count, database, sender, **options):
+    """Starts ``count`` worker processes, returning them."""
+    processes = [multiprocessing.Process(target=run_process, args=(database, sender, options), daemon=True)
+                 for _ in range(count)]
+
+    for process in processes:
+        process.start()
+
+    return processes
+
+
+def main():
+    try:
+        os.chdir(os.path.dirname(sys.argv[0]))
+    except OSError:
+        pass
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--database', default='data.db')
+    parser.add_argument('--lease', type=int, default=60, help='seconds a claimed reminder stays leased')
+    parser.add_argument('--batch', type=int, default=50, help='reminders claimed at once')
+    args = parser.parse_args()
+
+    processes = spawn(args.processes, args.database, HTTPSender('token-here'), lease=args.lease, batch=args.batch)
+    for process in processes:
+        process.join()
+
+
+if __name__ == '__main__':
+    main()